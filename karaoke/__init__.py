@@ -0,0 +1,5 @@
+"""Karaoke video maker: scrolling staff photos under a lyrics bar, rendered with cairo.
+
+Importing the package is cheap; cairo, NumPy and PIL are only loaded by the
+modules that draw or decode images (``karaoke.assets``, ``karaoke.render``).
+"""
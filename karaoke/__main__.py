@@ -0,0 +1,3 @@
+from karaoke.cli import main
+
+main()
@@ -0,0 +1,135 @@
+import os
+from functools import lru_cache
+
+from karaoke.config import bg_height, half_width, height, width
+
+
+# ---------------------------
+# Asset Caches
+# ---------------------------
+# Decoded assets are cached per process keyed on (path, mtime, size), so a warm
+# batch worker only decodes an image again when the file on disk changes.
+# NumPy and PIL are imported inside the decoders so that listing and stat-ing
+# assets stays cheap.
+def file_key(path):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def load_cover_canvas(path):
+    try:
+        return _load_cover_canvas(file_key(path))
+    except Exception as e:
+        raise RuntimeError(f"Error loading {path}: {e}")
+
+
+@lru_cache(maxsize=16)
+def _load_cover_canvas(key):
+    import numpy as np
+    from PIL import Image
+
+    img = Image.open(key[0]).convert("RGB")
+    img_width, img_height = img.size
+    # Use "cover" scaling so that the image fills the entire frame.
+    scale = min(width / img_width, height / img_height)
+    new_width = int(img_width * scale)
+    new_height = int(img_height * scale)
+    img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+    # Center-crop to exactly (width, height)
+    left = (new_width - width) // 2
+    top = (new_height - height) // 2
+    img_cropped = img_resized.crop((left, top, left + width, top + height))
+    img_array = np.array(img_cropped, dtype=np.uint8)
+    # Swap channels for cairo (BGRA order)
+    img_array = img_array[:, :, ::-1]
+    # Create a full-frame canvas with full opacity.
+    canvas = np.empty((height, width, 4), dtype=np.uint8)
+    canvas[:, :, :3] = img_array
+    canvas[:, :, 3] = 255
+    return canvas
+
+
+def list_staff_images(staff_dir):
+    # Collect all PNG file paths (with their root) from the staff folder.
+    image_list = []
+    for root, _, files in os.walk(staff_dir):
+        for file in files:
+            if file.lower().endswith(".png"):
+                image_list.append((root, file))
+
+    # Sort the list so that images whose root contains "instrcutros" come first.
+    image_list.sort(
+        key=lambda tup: (0 if "instrcutros" in tup[0].lower() else 1, tup[0], tup[1])
+    )
+    return [os.path.join(root, file) for root, file in image_list]
+
+
+def load_staff_canvases(staff_dir):
+    keys = tuple(file_key(path) for path in list_staff_images(staff_dir))
+    composite_canvases = _load_staff_canvases(keys)
+    if not composite_canvases:
+        raise RuntimeError(f"No images found in the '{staff_dir}' directory.")
+    return composite_canvases
+
+
+@lru_cache(maxsize=256)
+def _load_half_canvas(key):
+    import numpy as np
+    from PIL import Image
+
+    # "Fit" scaling: scale so the image's height equals bg_height.
+    img = Image.open(key[0]).convert("RGB")
+    img_width, img_height = img.size
+    scale = bg_height / img_height
+    new_width = int(img_width * scale)
+    new_height = bg_height  # by design
+    img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+
+    # Create a half-canvas with a black background.
+    half_canvas = np.zeros((bg_height, half_width, 4), dtype=np.uint8)
+    half_canvas[..., 3] = 255
+
+    # Center the resized image horizontally within the half-canvas.
+    left_margin = (half_width - new_width) // 2
+    if new_width > half_width:
+        img_array = np.array(img_resized)[:, :half_width, :]
+    else:
+        img_array = np.array(img_resized)
+    # Swap channels for cairo (BGRA)
+    img_array = img_array[:, :, ::-1]
+    paste_start = max(0, left_margin)
+    paste_end = paste_start + min(new_width, half_width)
+    half_canvas[:, paste_start:paste_end, :3] = img_array[
+        :, : (paste_end - paste_start), :
+    ]
+    return half_canvas
+
+
+@lru_cache(maxsize=8)
+def _load_staff_canvases(keys):
+    import numpy as np
+
+    half_canvases = []  # Each is a numpy array of shape (bg_height, half_width, 4)
+    for key in keys:
+        try:
+            half_canvases.append(_load_half_canvas(key))
+        except Exception as e:
+            print(f"Error loading image {os.path.basename(key[0])}: {e}")
+
+    # Each composite canvas is of size (bg_height, width, 4) with two images side-by-side.
+    composite_canvases = []
+    num_half = len(half_canvases)
+    i = 0
+    while i < num_half:
+        composite = np.zeros((bg_height, width, 4), dtype=np.uint8)
+        composite[..., 3] = 255
+        # Left half:
+        composite[:, 0:half_width, :] = half_canvases[i]
+        # Right half: if available, use half_canvases[i+1]; otherwise, duplicate the left half.
+        if i + 1 < num_half:
+            composite[:, half_width:width, :] = half_canvases[i + 1]
+        else:
+            composite[:, half_width:width, :] = half_canvases[i]
+        composite_canvases.append(composite)
+        i += 2
+    return composite_canvases
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import sys
+import time as timer
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from karaoke.config import DEFAULT_JOB
+
+# Job keys holding file paths; relative paths are resolved against the manifest.
+PATH_KEYS = (
+    "subtitle_file",
+    "audio",
+    "staff_dir",
+    "logo",
+    "credits",
+    "output",
+    "beats",
+    "staff_names",
+    "spool",
+)
+
+
+# ---------------------------
+# Job Manifest
+# ---------------------------
+def load_manifest(path):
+    """Read a JSON manifest of the form {"defaults": {...}, "jobs": [{...}, ...]}."""
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults", {})
+    jobs = []
+    for i, entry in enumerate(manifest["jobs"]):
+        job = {**DEFAULT_JOB, **defaults, **entry}
+        unknown = set(job) - set(DEFAULT_JOB) - {"name"}
+        if unknown:
+            raise ValueError(f"Job {i}: unknown keys {sorted(unknown)}")
+        if job["subtitle_file"] is None:
+            raise ValueError(f"Job {i}: 'subtitle_file' is required")
+        for key in PATH_KEYS:
+            if job[key] is not None:
+                job[key] = os.path.join(base, job[key])
+        job.setdefault("name", os.path.basename(job["output"]))
+        jobs.append(job)
+    return jobs
+
+
+def run_job(job):
+    # Runs inside a pool worker; the asset and text-sprite caches in
+    # karaoke.assets/karaoke.render live for the life of the worker, so a
+    # worker that renders several jobs reuses what its earlier jobs decoded.
+    # Workers do not share them.
+    from karaoke.render import render
+
+    return job["name"], render(
+        {k: v for k, v in job.items() if k != "name"}, progress=False
+    )
+
+
+# ---------------------------
+# Batch Runner
+# ---------------------------
+def report(name, stats):
+    print(
+        f"{name}: {stats['frames']} frames in {stats['seconds']:.1f}s "
+        f"({stats['fps']:.1f} fps) -> {stats['output']}"
+    )
+
+
+def report_failure(name, error):
+    print(f"{name}: FAILED: {type(error).__name__}: {error}")
+
+
+def run_batch(jobs, workers=1):
+    """Render every job; a failing job is reported and does not stop the others.
+
+    Returns (results, failures) with the stats of the finished jobs and the
+    (name, exception) of the failed ones.
+    """
+    start = timer.perf_counter()
+    results = []
+    failures = []
+    if workers <= 1:
+        for job in jobs:
+            try:
+                name, stats = run_job(job)
+            except Exception as e:
+                report_failure(job["name"], e)
+                failures.append((job["name"], e))
+                continue
+            report(name, stats)
+            results.append(stats)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {pool.submit(run_job, job): job["name"] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    name, stats = future.result()
+                except Exception as e:
+                    report_failure(futures[future], e)
+                    failures.append((futures[future], e))
+                    continue
+                report(name, stats)
+                results.append(stats)
+    elapsed = timer.perf_counter() - start
+    total_frames = sum(stats["frames"] for stats in results)
+    print(
+        f"{len(results)} jobs, {total_frames} frames in {elapsed:.1f}s "
+        f"({total_frames / elapsed:.1f} fps overall)"
+        + (f", {len(failures)} failed" if failures else "")
+    )
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render several karaoke videos from a JSON job manifest"
+    )
+    parser.add_argument("manifest", help="*.json file listing the jobs to render")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+    results, failures = run_batch(load_manifest(args.manifest), workers=args.workers)
+    if failures:
+        sys.exit(
+            f"{len(failures)} of {len(results) + len(failures)} jobs failed: "
+            + ", ".join(name for name, _ in failures)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+
+from karaoke import config
+from karaoke.assets import list_staff_images
+from karaoke.encode import concat_segments
+
+MANIFEST_VERSION = 1
+
+
+# ---------------------------
+# Input Fingerprint
+# ---------------------------
+def hash_file(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest
+
+
+def job_fingerprint(job):
+    """Hash every input and parameter that affects the rendered frames or the encode."""
+    inputs = {
+        "subtitle_file": hash_file(job["subtitle_file"]).hexdigest(),
+        "audio": hash_file(job["audio"]).hexdigest() if job["audio"] else None,
+        "logo": hash_file(job["logo"]).hexdigest(),
+        "credits": hash_file(job["credits"]).hexdigest(),
+        "staff": [
+            [os.path.relpath(path, job["staff_dir"]), hash_file(path).hexdigest()]
+            for path in list_staff_images(job["staff_dir"])
+        ],
+    }
+    for key in ("beats", "staff_names"):
+        inputs[key] = hash_file(job[key]).hexdigest() if job[key] else None
+    params = {
+        key: job[key]
+        for key in ("title", "fps", "profile", "segment_seconds", "style", "spectrum")
+    }
+    params["config"] = {
+        key: getattr(config, key)
+        for key in (
+            "width",
+            "height",
+            "bar_height",
+            "static_duration",
+            "static_fade_duration",
+            "transition_duration",
+            "credits_start_time",
+        )
+    }
+    payload = json.dumps([MANIFEST_VERSION, inputs, params], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest(), inputs, params
+
+
+def segment_ranges(nframes, segment_frames):
+    return [
+        (first, min(first + segment_frames, nframes))
+        for first in range(0, nframes, segment_frames)
+    ]
+
+
+# ---------------------------
+# Segment Checkpoint
+# ---------------------------
+class Checkpoint:
+    """Segments of one render plus a manifest recording which are finished.
+
+    Segments live in ``<output>.parts/``. Each is an independent encode, so it
+    starts on a keyframe, and is only renamed to its final name once ffmpeg has
+    closed it; a killed render therefore loses at most the segment in progress.
+    A manifest written for different inputs or parameters is discarded.
+    """
+
+    def __init__(self, job, nframes):
+        self.output = job["output"]
+        self.audio = job["audio"]
+        self.dir = self.output + ".parts"
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+        fingerprint, inputs, params = job_fingerprint(job)
+        segment_frames = max(1, int(round(job["segment_seconds"] * job["fps"])))
+        self.segments = segment_ranges(nframes, segment_frames)
+
+        manifest = self._load_manifest()
+        if manifest is not None and manifest["fingerprint"] != fingerprint:
+            print(f"Inputs changed since the last run; discarding {self.dir}")
+            shutil.rmtree(self.dir)
+            manifest = None
+        if manifest is None:
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "fingerprint": fingerprint,
+                "inputs": inputs,
+                "params": params,
+                "segments": [list(r) for r in self.segments],
+                "completed": [],
+            }
+        self.manifest = manifest
+        # A completed entry only counts if its file is still there.
+        self.completed = {
+            i for i in manifest["completed"] if os.path.isfile(self.segment_path(i))
+        }
+        os.makedirs(self.dir, exist_ok=True)
+        self._save_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self):
+        self.manifest["completed"] = sorted(self.completed)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def segment_path(self, index):
+        return os.path.join(self.dir, f"seg_{index:05d}.mp4")
+
+    def partial_path(self, index):
+        return os.path.join(self.dir, f"seg_{index:05d}.partial.mp4")
+
+    @property
+    def frames_done(self):
+        return sum(
+            last - first
+            for i, (first, last) in enumerate(self.segments)
+            if i in self.completed
+        )
+
+    def pending(self):
+        return [
+            (i, first, last)
+            for i, (first, last) in enumerate(self.segments)
+            if i not in self.completed
+        ]
+
+    def mark_done(self, index):
+        os.replace(self.partial_path(index), self.segment_path(index))
+        self.completed.add(index)
+        self._save_manifest()
+
+    def finish(self):
+        """Stream-copy the segments into the output, mux the audio and clean up."""
+        list_file = os.path.join(self.dir, "concat.txt")
+        with open(list_file, "w") as f:
+            for i in range(len(self.segments)):
+                f.write(f"file '{os.path.basename(self.segment_path(i))}'\n")
+        concat_segments(list_file, self.output, audio=self.audio)
+        shutil.rmtree(self.dir)
@@ -0,0 +1,205 @@
+import argparse
+import sys
+
+from karaoke.config import DEFAULT_JOB, SPECTRUM_MODES, STYLES
+from karaoke.encode import ENCODE_PROFILES, RENDITIONS
+
+
+# ---------------------------
+# Argument Parsing
+# ---------------------------
+def parse_renditions(parser, value):
+    renditions = value.split(",") if value else None
+    for name in renditions or []:
+        if name not in RENDITIONS:
+            parser.error(
+                f"unknown rendition {name!r} (available: {', '.join(RENDITIONS)})"
+            )
+    return renditions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create a karaoke video from a subtitle file and optionally an audio file"
+    )
+    parser.add_argument(
+        "-f", "--fps", type=int, default=DEFAULT_JOB["fps"], help="frames per second"
+    )
+    parser.add_argument(
+        "-a",
+        "--audio",
+        default=None,
+        help="file containing music audio (supported: *.mp3, *.mp4)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=DEFAULT_JOB["output"],
+        help="output video file (format: *.mp4, default: output.mp4)",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        default=DEFAULT_JOB["profile"],
+        choices=sorted(ENCODE_PROFILES),
+        help="encoder tuning profile (default: web)",
+    )
+    parser.add_argument(
+        "-r",
+        "--renditions",
+        default=None,
+        help="comma-separated renditions encoded from one render pass, "
+        f"e.g. 720p,480p (available: {', '.join(RENDITIONS)}); "
+        "use an *.m3u8 output for an HLS ladder",
+    )
+    parser.add_argument(
+        "--staff-dir",
+        default=DEFAULT_JOB["staff_dir"],
+        help="folder of staff *.png images",
+    )
+    parser.add_argument(
+        "--logo", default=DEFAULT_JOB["logo"], help="image for the intro"
+    )
+    parser.add_argument(
+        "--credits", default=DEFAULT_JOB["credits"], help="image for the end"
+    )
+    parser.add_argument(
+        "--title", default=DEFAULT_JOB["title"], help="text shown with the intro logo"
+    )
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=DEFAULT_JOB["segment_seconds"],
+        help="render in checkpointed segments of this many seconds; rerunning "
+        "the same command resumes after the last finished segment",
+    )
+    parser.add_argument(
+        "--backend",
+        default=DEFAULT_JOB["backend"],
+        choices=["cairo", "ffmpeg"],
+        help="renderer for the scroll phase: cairo draws every frame in Python, "
+        "ffmpeg pans a pre-rendered strip in a filtergraph (default: cairo)",
+    )
+    parser.add_argument(
+        "--style",
+        default=DEFAULT_JOB["style"],
+        choices=STYLES,
+        help="staff animation: scroll pans side-by-side photos, kenburns zooms "
+        "one photo at a time, polaroid drops tilted cards, grid pops pages of "
+        "portraits (default: scroll)",
+    )
+    parser.add_argument(
+        "--beats",
+        default=DEFAULT_JOB["beats"],
+        help="JSON list of beat times in seconds; polaroid cards bob on each beat",
+    )
+    parser.add_argument(
+        "--staff-names",
+        metavar="FILE.json",
+        default=DEFAULT_JOB["staff_names"],
+        help='JSON list of {"image", "name"} entries, like remotion/staff.json, '
+        "naming the kenburns, polaroid and grid cards by image file name "
+        "(default: no names)",
+    )
+    parser.add_argument(
+        "--spectrum",
+        default=DEFAULT_JOB["spectrum"],
+        choices=SPECTRUM_MODES,
+        help="audio spectrum drawn from --audio inside the gradient bar or "
+        "along the bottom of the frame (default: off)",
+    )
+    parser.add_argument(
+        "--spool",
+        metavar="FILE.mkv",
+        default=DEFAULT_JOB["spool"],
+        help="also write the rendered frames losslessly to FILE.mkv, so that "
+        "python -m karaoke.spool can encode other profiles, renditions or "
+        "excerpts without rendering again",
+    )
+    parser.add_argument(
+        "--vfr",
+        action="store_true",
+        help="variable frame rate: encode the logo hold and the credits, where "
+        "nothing moves, at a few fps instead of --fps",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="DIR",
+        default=None,
+        help="coordinate a render spread over worker nodes: publish segments "
+        "to the shared directory DIR, wait for workers (python -m karaoke.cluster "
+        "DIR) to render them, then stitch them and mux the audio",
+    )
+    parser.add_argument(
+        "--local-workers",
+        type=int,
+        default=0,
+        help="with --queue, also start this many worker processes on this machine",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="validate the inputs and print the timeline without rendering",
+    )
+    parser.add_argument(
+        "--dump-timeline",
+        metavar="FILE.npz",
+        default=None,
+        help="write the compiled per-frame timeline arrays to FILE.npz and exit",
+    )
+    parser.add_argument(
+        "subtitle_file", help="*.srt file containing text aligned to audio"
+    )
+    args = parser.parse_args(argv)
+    return args, {
+        "subtitle_file": args.subtitle_file,
+        "audio": args.audio,
+        "staff_dir": args.staff_dir,
+        "logo": args.logo,
+        "credits": args.credits,
+        "title": args.title,
+        "output": args.output,
+        "fps": args.fps,
+        "profile": args.profile,
+        "renditions": parse_renditions(parser, args.renditions),
+        "segment_seconds": args.segment_seconds,
+        "backend": args.backend,
+        "style": args.style,
+        "beats": args.beats,
+        "staff_names": args.staff_names,
+        "spectrum": args.spectrum,
+        "spool": args.spool,
+        "vfr": args.vfr,
+    }
+
+
+def main(argv=None):
+    args, job = parse_args(argv)
+    if args.plan or args.dump_timeline:
+        from karaoke.plan import format_plan, make_plan
+
+        try:
+            plan = make_plan(job)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        if args.plan:
+            print(format_plan(plan))
+        if args.dump_timeline:
+            from karaoke.timeline import compile_job_timeline
+
+            compile_job_timeline(job, plan).save(args.dump_timeline)
+        return
+
+    if args.queue:
+        from karaoke.cluster import coordinate
+
+        try:
+            coordinate(job, args.queue, local_workers=args.local_workers)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        return
+
+    # Imported here so that --help, --plan and argument errors never load cairo/NumPy.
+    from karaoke.render import render
+
+    render(job)
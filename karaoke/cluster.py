@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import multiprocessing
+import shutil
+import socket
+import time as timer
+
+from karaoke.checkpoint import job_fingerprint, segment_ranges
+from karaoke.config import DEFAULT_JOB, height, width
+from karaoke.encode import concat_segments
+
+# Seconds per queued segment when the job does not set segment_seconds.
+DEFAULT_SEGMENT_SECONDS = 10.0
+HEARTBEAT_SECONDS = 5.0  # how often a worker touches its claim while rendering
+STALE_SECONDS = 60.0  # claims untouched this long are put back in the queue
+POLL_SECONDS = 1.0
+
+
+# ---------------------------
+# Directory Queue
+# ---------------------------
+# One render spread over several machines through a shared directory, with no
+# service in between:
+#
+#   job.json      the job, its fingerprint and the segment frame ranges
+#   pending/      one file per segment still to render
+#   claimed/      segments a worker is rendering; the file's mtime is its heartbeat
+#   done/         finished segments
+#   segments/     the encoded segment videos
+#
+# Every state change is an os.rename between these folders, which is atomic
+# within one filesystem, so exactly one worker wins each claim. A claim whose
+# worker stops touching it is renamed back to pending/ by the coordinator.
+# Paths in the job are absolute, so all nodes must mount the inputs and the
+# queue at the same paths.
+class Queue:
+    def __init__(self, directory):
+        self.dir = directory
+        self.job_path = os.path.join(directory, "job.json")
+
+    def folder(self, state):
+        return os.path.join(self.dir, state)
+
+    def entry(self, state, index):
+        return os.path.join(self.folder(state), f"seg_{index:05d}.json")
+
+    def segment_path(self, index):
+        return os.path.join(self.folder("segments"), f"seg_{index:05d}.mp4")
+
+    def entries(self, state):
+        try:
+            names = os.listdir(self.folder(state))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[4:9]) for name in names if name.endswith(".json"))
+
+    def load(self):
+        try:
+            with open(self.job_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, job, nframes):
+        """Queue every segment of a job that is not already done; returns the queue data."""
+        fingerprint = job_fingerprint(job)[0]
+        data = self.load()
+        if data is not None and data["fingerprint"] != fingerprint:
+            print(f"Inputs changed since the last run; discarding {self.dir}")
+            shutil.rmtree(self.dir)
+            data = None
+        if data is None:
+            segment_seconds = job["segment_seconds"] or DEFAULT_SEGMENT_SECONDS
+            segment_frames = max(1, int(round(segment_seconds * job["fps"])))
+            data = {
+                "fingerprint": fingerprint,
+                "job": job,
+                "segments": [list(r) for r in segment_ranges(nframes, segment_frames)],
+            }
+        for state in ("pending", "claimed", "done", "segments"):
+            os.makedirs(self.folder(state), exist_ok=True)
+        queued = set(self.entries("pending")) | set(self.entries("claimed"))
+        done = set()
+        for i in self.entries("done"):
+            # A done entry only counts if its video is still there.
+            if os.path.isfile(self.segment_path(i)):
+                done.add(i)
+            else:
+                os.remove(self.entry("done", i))
+        for i, (first, last) in enumerate(data["segments"]):
+            if i not in queued and i not in done:
+                with open(self.entry("pending", i), "w") as f:
+                    json.dump({"index": i, "first": first, "last": last}, f)
+        # Written last, so workers never see a job without its segments.
+        tmp_path = self.job_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.job_path)
+        return data
+
+    def claim(self):
+        """Move the first pending segment to claimed/; None if nothing is pending."""
+        for index in self.entries("pending"):
+            try:
+                os.rename(self.entry("pending", index), self.entry("claimed", index))
+                # rename keeps the publish time; start the heartbeat from now.
+                os.utime(self.entry("claimed", index))
+            except FileNotFoundError:
+                continue  # another worker got it first, or it was requeued already
+            return index
+        return None
+
+    def heartbeat(self, index):
+        try:
+            os.utime(self.entry("claimed", index))
+        except FileNotFoundError:
+            pass  # requeued as stale; finishing still records the segment
+
+    def complete(self, index, partial_path):
+        os.replace(partial_path, self.segment_path(index))
+        for state in ("claimed", "pending"):
+            try:
+                os.rename(self.entry(state, index), self.entry("done", index))
+                return
+            except FileNotFoundError:
+                continue
+        # Otherwise another worker holds a requeued claim; its output is identical.
+
+    def release(self, index):
+        """Give a claim back after a failed render."""
+        try:
+            os.rename(self.entry("claimed", index), self.entry("pending", index))
+        except FileNotFoundError:
+            pass
+
+    def requeue_stale(self, stale_seconds=STALE_SECONDS):
+        now = timer.time()
+        for index in self.entries("claimed"):
+            path = self.entry("claimed", index)
+            try:
+                if now - os.stat(path).st_mtime > stale_seconds:
+                    os.rename(path, self.entry("pending", index))
+                    print(
+                        f"Requeued segment {index} (no heartbeat for {stale_seconds:.0f}s)"
+                    )
+            except FileNotFoundError:
+                continue
+
+
+class Heartbeat:
+    """Progress sink for write_frames that keeps a claim fresh while rendering."""
+
+    def __init__(self, queue, index):
+        self.queue = queue
+        self.index = index
+        self.last = timer.monotonic()
+
+    def update(self, n=1):
+        if timer.monotonic() - self.last >= HEARTBEAT_SECONDS:
+            self.queue.heartbeat(self.index)
+            self.last = timer.monotonic()
+
+
+# ---------------------------
+# Worker
+# ---------------------------
+def work(directory, wait=True):
+    """Render queued segments until none are left; returns the number rendered."""
+    from karaoke.encode import FFmpegWriter
+    from karaoke.plan import make_plan
+    from karaoke.render import FRAME_PIX_FMT, build_renderer, write_frames
+
+    queue = Queue(directory)
+    data = queue.load()
+    while data is None and wait:
+        timer.sleep(POLL_SECONDS)
+        data = queue.load()
+    if data is None:
+        return 0
+    job = data["job"]
+    plan = make_plan(job)
+    renderer = None
+    tag = f"{socket.gethostname()}-{os.getpid()}"
+    rendered = 0
+    while os.path.isdir(directory):
+        index = queue.claim()
+        if index is None:
+            if not queue.entries("claimed"):
+                break
+            # Others are still rendering; their claims may yet come back as stale.
+            timer.sleep(POLL_SECONDS)
+            continue
+        first, last = data["segments"][index]
+        # Decode assets only once this worker has something to render.
+        if renderer is None:
+            renderer = build_renderer(job, plan)
+        partial_path = os.path.join(
+            queue.folder("segments"), f"seg_{index:05d}.{tag}.partial.mp4"
+        )
+        try:
+            with FFmpegWriter(
+                partial_path,
+                (width, height),
+                plan["fps"],
+                profile=job["profile"],
+                pix_fmt=FRAME_PIX_FMT,
+            ) as writer:
+                write_frames(
+                    renderer, writer, plan, first, last, Heartbeat(queue, index), {}
+                )
+        except BaseException:
+            queue.release(index)
+            raise
+        queue.complete(index, partial_path)
+        rendered += 1
+        print(f"[{tag}] segment {index}: frames {first}-{last - 1}")
+    return rendered
+
+
+# ---------------------------
+# Coordinator
+# ---------------------------
+def coordinate(job, directory, local_workers=0, progress=True):
+    """Publish a job to a queue directory, wait for its segments and stitch them.
+
+    With local_workers, that many worker processes are started on this machine,
+    standing in for other nodes; workers elsewhere can join at any time with
+    ``python -m karaoke.cluster DIR``.
+    """
+    from tqdm import tqdm
+
+    from karaoke.plan import make_plan
+
+    job = {**DEFAULT_JOB, **job}
+    if job["renditions"] or job["spool"] or job["vfr"]:
+        raise RuntimeError(
+            "Queued renders do not support renditions, a spool or VFR output."
+        )
+    if job["backend"] != "cairo":
+        # Workers draw every frame with write_frames.
+        raise RuntimeError("Queued renders need the cairo backend.")
+    plan = make_plan(job)
+    for key in (
+        "subtitle_file",
+        "audio",
+        "staff_dir",
+        "logo",
+        "credits",
+        "beats",
+        "staff_names",
+    ):
+        if job[key] is not None:
+            job[key] = os.path.abspath(job[key])
+    job["output"] = os.path.abspath(job["output"])
+
+    queue = Queue(os.path.abspath(directory))
+    data = queue.publish(job, plan["nframes"])
+    segments = data["segments"]
+    workers = [
+        multiprocessing.Process(target=work, args=(queue.dir,))
+        for _ in range(local_workers)
+    ]
+    for w in workers:
+        w.start()
+    try:
+        with tqdm(total=plan["nframes"], unit="frame", disable=not progress) as bar:
+            while True:
+                done = queue.entries("done")
+                bar.update(sum(segments[i][1] - segments[i][0] for i in done) - bar.n)
+                if len(done) == len(segments):
+                    break
+                queue.requeue_stale()
+                if workers and not any(w.is_alive() for w in workers):
+                    raise RuntimeError(
+                        "All local workers exited before the render finished."
+                    )
+                timer.sleep(POLL_SECONDS)
+    finally:
+        for w in workers:
+            w.join()
+
+    list_file = os.path.join(queue.dir, "concat.txt")
+    with open(list_file, "w") as f:
+        for i in range(len(segments)):
+            f.write(f"file '{os.path.relpath(queue.segment_path(i), queue.dir)}'\n")
+    concat_segments(list_file, job["output"], audio=job["audio"])
+    shutil.rmtree(queue.dir)
+    return {"output": job["output"], "frames": plan["nframes"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m karaoke.cluster",
+        description="Render segments from a shared queue directory",
+    )
+    parser.add_argument("queue", help="queue directory published by main.py --queue")
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="exit if no job has been published yet instead of waiting for one",
+    )
+    args = parser.parse_args(argv)
+    work(args.queue, wait=not args.no_wait)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# ---------------------------
+# Video Dimensions & Configuration
+# ---------------------------
+width, height = 1280, 720
+bar_height = 80  # Gradient bar at the top
+bg_height = height - bar_height  # Background area for images
+half_width = width // 2
+
+# Durations (in seconds)
+static_duration = 6.5  # Static phase (logo shown)
+static_fade_duration = 2.0  # Fade-in of the logo at the start of the static phase
+transition_duration = 3.5  # Transition phase (fade from static to dynamic)
+dynamic_start = static_duration + transition_duration
+credits_start_time = 86.00  # At this time, stop scrolling and show credits
+
+# Staff animations; all but "scroll" are drawn by karaoke.styles.
+STYLES = ("scroll", "kenburns", "polaroid", "grid")
+# Audio spectrum placements; see karaoke.spectrum.
+SPECTRUM_MODES = ("off", "bar", "footer")
+
+# Everything that describes one video; batch manifests override these per job.
+DEFAULT_JOB = {
+    "subtitle_file": None,
+    "audio": None,
+    "staff_dir": "staff",
+    "logo": "logo.png",
+    "credits": "credits.png",
+    "title": "Welcome to 6.390!",
+    "output": "output.mp4",
+    "fps": 120,
+    "profile": "web",
+    "renditions": None,
+    "segment_seconds": None,  # render in resumable segments of this length
+    "backend": "cairo",  # "cairo" or "ffmpeg" (scroll phase composited by ffmpeg)
+    "style": "scroll",  # staff animation: "scroll", "kenburns", "polaroid" or "grid"
+    "beats": None,  # JSON list of beat times in seconds, for the polaroid bob
+    "staff_names": None,  # JSON list of {"image", "name"} naming the staff cards
+    "spectrum": "off",  # audio spectrum: "off", "bar" or "footer" (needs audio)
+    "spool": None,  # also write the frames to this lossless *.mkv for re-encoding
+    "vfr": False,  # encode still spans (logo hold, credits) at a few fps
+}
@@ -0,0 +1,301 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+# ---------------------------
+# Encode Profiles
+# ---------------------------
+# Software-only x264 settings so that every machine produces the same output.
+# "threads": 0 lets x264 pick a thread count for the host.
+ENCODE_PROFILES = {
+    "archive": {"preset": "slow", "crf": 16, "tune": "film", "threads": 0},
+    "web": {"preset": "medium", "crf": 23, "tune": None, "threads": 0},
+    "preview": {"preset": "ultrafast", "crf": 30, "tune": "fastdecode", "threads": 0},
+}
+
+# ---------------------------
+# Rendition Ladder
+# ---------------------------
+# name -> (width, height, maxrate); maxrate caps the CRF bitrate for streaming.
+# Frames are drawn at 1280x720, so the ladder stops there: a larger rung would
+# only upscale them at a higher bitrate, with no added detail.
+RENDITIONS = {
+    "720p": (1280, 720, "3500k"),
+    "480p": (854, 480, "1500k"),
+}
+
+# Audio codecs each container accepts as a stream copy; anything else is encoded to AAC.
+COPY_AUDIO_CODECS = {
+    ".mp4": {"aac", "mp3", "alac", "ac3"},
+    ".mov": {"aac", "mp3", "alac", "ac3", "pcm_s16le"},
+    ".m4a": {"aac", "alac"},
+    ".m3u8": {"aac", "mp3", "ac3"},
+    ".mkv": None,  # accepts any codec
+}
+
+
+def ffmpeg_exe():
+    # imageio-ffmpeg ships a static ffmpeg binary; imported lazily for fast startup.
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def probe_audio(path):
+    """Return (codec, duration) of an audio file from its header, without decoding.
+
+    Uses ffprobe when it is installed and falls back to parsing ``ffmpeg -i``.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is not None:
+        result = subprocess.run(
+            [
+                ffprobe,
+                "-v",
+                "error",
+                "-select_streams",
+                "a:0",
+                "-show_entries",
+                "stream=codec_name:format=duration",
+                "-of",
+                "json",
+                path,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        info = json.loads(result.stdout or "{}")
+        if info.get("streams") and "duration" in info.get("format", {}):
+            return info["streams"][0]["codec_name"], float(info["format"]["duration"])
+        raise RuntimeError(f"Could not read audio stream from {path}")
+
+    result = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-i", path],
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    )
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", result.stderr)
+    codec = re.search(r"Stream #\S+.*?: Audio: (\w+)", result.stderr)
+    if duration is None or codec is None:
+        raise RuntimeError(f"Could not read audio stream from {path}")
+    h, m, sec = duration.groups()
+    return codec.group(1), int(h) * 3600 + int(m) * 60 + float(sec)
+
+
+def audio_copy_ok(codec, output):
+    """Whether an audio stream with this codec can be copied into the output container."""
+    allowed = COPY_AUDIO_CODECS.get(os.path.splitext(output)[1].lower(), set())
+    return allowed is None or codec in allowed
+
+
+def video_args(profile):
+    """x264 arguments for an encode profile (a name or an ENCODE_PROFILES entry)."""
+    p = ENCODE_PROFILES[profile] if isinstance(profile, str) else profile
+    args = ["-c:v", "libx264", "-preset", p["preset"], "-crf", str(p["crf"])]
+    if p["tune"]:
+        args += ["-tune", p["tune"]]
+    args += ["-threads", str(p["threads"]), "-pix_fmt", "yuv420p"]
+    return args
+
+
+def spool_args():
+    """Lossless, all-intra FFV1 in Matroska, so any frame can be decoded on its own."""
+    return [
+        "-c:v",
+        "ffv1",
+        "-level",
+        "3",
+        "-g",
+        "1",
+        "-slices",
+        "16",
+        "-slicecrc",
+        "1",
+        "-pix_fmt",
+        "gbrp",
+        "-f",
+        "matroska",
+    ]
+
+
+def audio_args(codec, output):
+    """Map the second ffmpeg input's audio, copying it when the container allows."""
+    args = ["-map", "1:a:0"]
+    if audio_copy_ok(codec, output):
+        args += ["-c:a", "copy"]
+    else:
+        args += ["-c:a", "aac", "-b:a", "192k"]
+    return args + ["-shortest"]
+
+
+def concat_segments(list_file, output, audio=None):
+    """Join encoded segments listed in an ffmpeg concat file by stream copy, muxing audio."""
+    cmd = [
+        ffmpeg_exe(),
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        list_file,
+    ]
+    if audio is not None:
+        cmd += ["-i", audio]
+    cmd += ["-map", "0:v:0", "-c:v", "copy"]
+    if audio is not None:
+        cmd += audio_args(probe_audio(audio)[0], output)
+    cmd += ["-movflags", "+faststart", output]
+    subprocess.run(cmd, check=True)
+
+
+def rendition_paths(output, names):
+    """Map each rendition name to its output path, e.g. video.mp4 -> video_720p.mp4."""
+    stem, ext = os.path.splitext(output)
+    return [(name, f"{stem}_{name}{ext}") for name in names]
+
+
+def write_master_playlist(output, renditions):
+    """Write an HLS master playlist that references each rendition playlist."""
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    out_dir = os.path.dirname(output)
+    for name, path in renditions:
+        w, h, maxrate = RENDITIONS[name]
+        bandwidth = int(maxrate.rstrip("k")) * 1000
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={w}x{h}")
+        lines.append(os.path.relpath(path, out_dir or "."))
+    with open(output, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class FFmpegWriter:
+    """Feed raw frames once to a single ffmpeg process that writes every output.
+
+    Frames are C-contiguous arrays in ``pix_fmt`` order: "rgb24" (height, width, 3)
+    or "bgra" (height, width, 4), the native byte order of cairo surfaces, which
+    lets the renderer pipe its surface memory without converting it.
+
+    With renditions, the input is split inside ffmpeg and scaled per output,
+    so frames are rendered and piped exactly once regardless of the ladder size.
+    The audio file is passed to ffmpeg as a second input and muxed in the same
+    process (stream-copied when the container allows it), so no temporary audio
+    file is written. With a spool path, the same frames are also written to a
+    lossless FFV1 file that karaoke.spool can re-encode without rendering.
+    """
+
+    def __init__(
+        self,
+        output,
+        size,
+        fps,
+        profile="web",
+        audio=None,
+        renditions=None,
+        pix_fmt="rgb24",
+        spool=None,
+    ):
+        self.output = output
+        self.size = size
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.spool = spool
+        self.profile = ENCODE_PROFILES[profile]
+        self.audio = audio
+        self.audio_codec = probe_audio(audio)[0] if audio is not None else None
+        self.renditions = rendition_paths(output, renditions) if renditions else None
+        self.proc = subprocess.Popen(self._command(), stdin=subprocess.PIPE)
+
+    def _video_args(self):
+        return video_args(self.profile)
+
+    def _audio_args(self, path):
+        if self.audio is None:
+            return []
+        return audio_args(self.audio_codec, path)
+
+    def _container_args(self, path):
+        if path.endswith(".m3u8"):
+            stem = os.path.splitext(path)[0]
+            return [
+                "-f",
+                "hls",
+                "-hls_time",
+                "6",
+                "-hls_playlist_type",
+                "vod",
+                "-hls_segment_filename",
+                f"{stem}_%03d.ts",
+            ]
+        return ["-movflags", "+faststart"]
+
+    def _input_args(self):
+        width, height = self.size
+        return [
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            self.pix_fmt,
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+        ]
+
+    def _audio_input_args(self):
+        return ["-i", self.audio]
+
+    def _command(self):
+        cmd = [ffmpeg_exe(), "-y", "-loglevel", "error"] + self._input_args()
+        if self.audio is not None:
+            cmd += self._audio_input_args()
+        if self.spool is not None:
+            cmd += ["-map", "0:v:0"] + spool_args() + [self.spool]
+
+        if not self.renditions:
+            cmd += (
+                ["-map", "0:v:0"] + self._video_args() + self._audio_args(self.output)
+            )
+            cmd += self._container_args(self.output) + [self.output]
+            return cmd
+
+        n = len(self.renditions)
+        graph = [f"[0:v]split={n}" + "".join(f"[s{i}]" for i in range(n))]
+        for i, (name, _) in enumerate(self.renditions):
+            w, h, _ = RENDITIONS[name]
+            graph.append(f"[s{i}]scale={w}:{h}:flags=lanczos[v{i}]")
+        cmd += ["-filter_complex", ";".join(graph)]
+        for i, (name, path) in enumerate(self.renditions):
+            maxrate = RENDITIONS[name][2]
+            cmd += ["-map", f"[v{i}]"] + self._video_args()
+            cmd += ["-maxrate", maxrate, "-bufsize", maxrate]
+            cmd += self._audio_args(path) + self._container_args(path) + [path]
+        return cmd
+
+    def write_frame(self, frame):
+        # Written straight from the array's buffer; no bytes copy per frame.
+        self.proc.stdin.write(memoryview(frame))
+
+    def close(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.proc.returncode}")
+        if self.renditions and self.output.endswith(".m3u8"):
+            write_master_playlist(self.output, self.renditions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.proc.kill()
+            self.proc.wait()
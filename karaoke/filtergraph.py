@@ -0,0 +1,193 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time as timer
+
+import numpy as np
+from PIL import Image
+
+from karaoke.config import bg_height, dynamic_start, height, width
+from karaoke.encode import FFmpegWriter, concat_segments, ffmpeg_exe, video_args
+
+
+# ---------------------------
+# ffmpeg Filtergraph Backend
+# ---------------------------
+# The scroll phase is a horizontal pan over a fixed strip of composite canvases
+# under a bar that only changes when the subtitle does. This backend writes the
+# strip once as an image and lets ffmpeg crop it per frame; Python only draws
+# one bar sprite per subtitle change. The other phases still go through cairo,
+# and all three parts are joined by stream copy.
+def write_strip(background_images, path):
+    """Write the strip above a copy of itself shifted left by half a pixel.
+
+    cairo paints the strip at sub-pixel offsets with bilinear filtering. The
+    half-pixel row holds the average of each pair of neighbours, which is what
+    cairo draws at an offset of k + 0.5, so cropping the nearer of the two rows
+    is at most a quarter pixel off, without resampling any frame in ffmpeg.
+    """
+    # The first composite is appended so that the wrap-around needs no second draw.
+    strip = np.concatenate(list(background_images) + [background_images[0]], axis=1)
+    strip = strip[:, :, [2, 1, 0]]
+    half = strip.copy()
+    half[:, :-1] = (strip[:, :-1].astype(np.uint16) + strip[:, 1:] + 1) >> 1
+    Image.fromarray(np.concatenate([strip, half], axis=0)).save(path, compress_level=1)
+
+
+def subtitle_spans(timeline, first, last):
+    """Runs of consecutive frames in [first, last) that show the same subtitle."""
+    ids = timeline.subtitle[first:last]
+    starts = np.flatnonzero(np.diff(ids)) + 1
+    bounds = np.concatenate([[0], starts, [len(ids)]])
+    return [
+        [timeline.texts[ids[a]] if ids[a] >= 0 else "", int(b - a)]
+        for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def write_bar_stream(spans, fps, work_dir):
+    """Write one PNG per distinct bar and an ffmpeg concat list holding each span."""
+    from karaoke.render import bar_sprite
+
+    sprite_paths = {}
+    list_file = os.path.join(work_dir, "bars.txt")
+    with open(list_file, "w") as f:
+        for text, frames in spans:
+            if text not in sprite_paths:
+                path = os.path.join(work_dir, f"bar_{len(sprite_paths):04d}.png")
+                Image.fromarray(bar_sprite(text)[:, :, [2, 1, 0]]).save(path)
+                sprite_paths[text] = path
+            f.write(f"file '{os.path.basename(sprite_paths[text])}'\n")
+            f.write(f"duration {frames / fps:.6f}\n")
+        # The concat demuxer ignores the duration of the last entry unless it is repeated.
+        f.write(f"file '{os.path.basename(sprite_paths[spans[-1][0]])}'\n")
+    return list_file
+
+
+def scroll_position(renderer, first, fps, n):
+    """ffmpeg expression of the scroll position at the n-th output frame.
+
+    Same as the cairo path: pos = (scroll_speed * t_dynamic) % cycle_length, with
+    t = (first + n) / fps.
+    """
+    return (
+        f"mod({renderer.scroll_speed!r}*(({first}+{n})/{fps}-{dynamic_start!r}),"
+        f"{renderer.cycle_length})"
+    )
+
+
+def render_scroll_segment(renderer, first, last, fps, profile, work_dir, path, bar):
+    strip_path = os.path.join(work_dir, "strip.png")
+    write_strip(renderer.background_images, strip_path)
+    bars = write_bar_stream(
+        subtitle_spans(renderer.timeline, first, last), fps, work_dir
+    )
+    # The position in half pixels picks the row of the strip (see write_strip)
+    # and the whole pixels to crop at.
+    half_steps = f"floor(2*{scroll_position(renderer, first, fps, 'n')}+0.5)"
+    # The strip PNG is decoded once and repeated inside the graph; -loop 1 on the
+    # input would decode it again for every frame. Both inputs are timed in the
+    # output's 1/fps time base, so that vstack pairs frame n of the pan with
+    # frame n of the bars; microsecond timestamps round 1/30 s differently and
+    # shift the pan by a frame.
+    graph = (
+        f"[0:v]format=gbrp,loop=loop=-1:size=1,settb=1/{fps},setpts=N,"
+        f"crop=w={width}:h={bg_height}"
+        f":x='floor({half_steps}/2)':y='mod({half_steps},2)*{bg_height}'[scroll];"
+        f"[1:v]fps={fps},settb=1/{fps},format=gbrp[bar];"
+        f"[bar][scroll]vstack=inputs=2,format=yuv420p[out]"
+    )
+    cmd = [
+        ffmpeg_exe(),
+        "-y",
+        "-loglevel",
+        "error",
+        "-progress",
+        "pipe:1",
+        "-nostats",
+        "-i",
+        strip_path,
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        bars,
+        "-filter_complex",
+        graph,
+        "-map",
+        "[out]",
+        "-frames:v",
+        str(last - first),
+        "-r",
+        str(fps),
+    ]
+    cmd += video_args(profile) + [path]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    done = 0
+    for line in proc.stdout:
+        if line.startswith("frame="):
+            frame = int(line.split("=", 1)[1])
+            bar.update(frame - done)
+            done = frame
+    if proc.wait() != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+    bar.update(last - first - done)
+
+
+def render_filtergraph(job, plan, renderer, bar, phase_time):
+    from karaoke.render import FRAME_PIX_FMT, write_frames
+
+    if job["renditions"] or job["segment_seconds"]:
+        raise RuntimeError(
+            "The ffmpeg backend does not support renditions or segmented renders."
+        )
+    if job["style"] != "scroll":
+        raise RuntimeError("The ffmpeg backend only supports the 'scroll' style.")
+    if job["spectrum"] != "off":
+        raise RuntimeError("The ffmpeg backend does not draw the audio spectrum.")
+    fps = plan["fps"]
+    scroll = next((p for p in plan["phases"] if p["name"] == "scroll"), None)
+    if scroll is None:
+        raise RuntimeError("The ffmpeg backend needs a scroll phase.")
+    scroll_first = scroll["first_frame"]
+    scroll_last = scroll_first + scroll["frames"]
+
+    work_dir = tempfile.mkdtemp(
+        prefix=".karaoke-", dir=os.path.dirname(os.path.abspath(job["output"]))
+    )
+    try:
+        parts = []
+        for name, first, last in (
+            ("intro", 0, scroll_first),
+            ("scroll", scroll_first, scroll_last),
+            ("credits", scroll_last, plan["nframes"]),
+        ):
+            if first >= last:
+                continue
+            path = os.path.join(work_dir, f"{name}.mp4")
+            if name == "scroll":
+                start = timer.perf_counter()
+                render_scroll_segment(
+                    renderer, first, last, fps, job["profile"], work_dir, path, bar
+                )
+                phase_time["scroll"] = (timer.perf_counter() - start, last - first)
+            else:
+                with FFmpegWriter(
+                    path,
+                    (width, height),
+                    fps,
+                    profile=job["profile"],
+                    pix_fmt=FRAME_PIX_FMT,
+                ) as writer:
+                    write_frames(renderer, writer, plan, first, last, bar, phase_time)
+            parts.append(path)
+
+        list_file = os.path.join(work_dir, "parts.txt")
+        with open(list_file, "w") as f:
+            for path in parts:
+                f.write(f"file '{os.path.basename(path)}'\n")
+        concat_segments(list_file, job["output"], audio=job["audio"])
+    finally:
+        shutil.rmtree(work_dir)
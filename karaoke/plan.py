@@ -0,0 +1,205 @@
+import json
+import math
+import os
+
+from karaoke.assets import list_staff_images
+from karaoke.config import (
+    DEFAULT_JOB,
+    SPECTRUM_MODES,
+    STYLES,
+    credits_start_time,
+    dynamic_start,
+    static_duration,
+    width,
+)
+from karaoke.encode import probe_audio
+from karaoke.subtitles import parse_subtitles
+
+# ---------------------------
+# Benchmark Data
+# ---------------------------
+# Frames per second (render + encode) for each phase, per backend: the ffmpeg
+# backend composites the scroll phase at a very different rate than cairo.
+# Every finished render stores its measured rates under its backend in
+# BENCHMARK_FILE; these defaults are conservative figures for a 1280x720 cairo
+# render and are only used until then.
+DEFAULT_BENCHMARK_FPS = {
+    "static": 150.0,
+    "transition": 60.0,
+    "scroll": 100.0,
+    "credits": 150.0,
+}
+BENCHMARK_FILE = os.environ.get(
+    "KARAOKE_BENCHMARK",
+    os.path.join(os.path.expanduser("~"), ".cache", "karaoke", "benchmark.json"),
+)
+
+
+def read_benchmark_file():
+    """Stored rates as {backend: {phase: fps}}; files of the older flat form are ignored."""
+    try:
+        with open(BENCHMARK_FILE, "r") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(stored, dict):
+        return {}
+    return {k: v for k, v in stored.items() if isinstance(v, dict)}
+
+
+def load_benchmark(backend="cairo"):
+    return {**DEFAULT_BENCHMARK_FPS, **read_benchmark_file().get(backend, {})}
+
+
+def save_benchmark(backend, phase_fps):
+    # Several renders may finish at once: each writes a whole file under its own
+    # temporary name and renames it into place, so the file is never truncated.
+    stored = read_benchmark_file()
+    stored[backend] = {**stored.get(backend, {}), **phase_fps}
+    tmp_path = f"{BENCHMARK_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(BENCHMARK_FILE), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f, indent=2)
+        os.replace(tmp_path, BENCHMARK_FILE)
+    except OSError as e:
+        print(f"Could not save benchmark data to {BENCHMARK_FILE}: {e}")
+
+
+# ---------------------------
+# Timeline
+# ---------------------------
+def scroll_params(num_composites, T_total):
+    # Each composite canvas is exactly 'width' pixels wide
+    cycle_length = num_composites * width
+    T_dynamic = T_total - dynamic_start  # Duration for the scrolling portion
+    # Calculate scroll speed so that one full cycle is scrolled over T_dynamic.
+    return cycle_length, cycle_length / T_dynamic
+
+
+def frame_at(time, fps):
+    """Index of the first frame whose timestamp n / fps is at or after `time`."""
+    return int(math.ceil(time * fps))
+
+
+def phase_bounds(T_total):
+    """(name, start, end) of each non-empty phase, in order."""
+    bounds = [
+        ("static", 0.0, static_duration),
+        ("transition", static_duration, dynamic_start),
+        ("scroll", dynamic_start, credits_start_time),
+        ("credits", credits_start_time, T_total),
+    ]
+    return [
+        (name, start, min(end, T_total))
+        for name, start, end in bounds
+        if start < min(end, T_total)
+    ]
+
+
+def make_plan(job):
+    """Validate a job and compute its timeline without decoding or drawing anything."""
+    job = {**DEFAULT_JOB, **job}
+    problems = []
+
+    try:
+        relevant_lines = parse_subtitles(job["subtitle_file"])
+    except (OSError, ValueError) as e:
+        problems.append(str(e))
+        relevant_lines = []
+    for key in ("logo", "credits"):
+        if not os.path.isfile(job[key]):
+            problems.append(f"{key} image not found: {job[key]}")
+    staff_images = list_staff_images(job["staff_dir"])
+    if not staff_images:
+        problems.append(f"No images found in the '{job['staff_dir']}' directory.")
+    if job["style"] not in STYLES:
+        problems.append(
+            f"Unknown style {job['style']!r} (available: {', '.join(STYLES)})"
+        )
+    if job["spectrum"] not in SPECTRUM_MODES:
+        problems.append(
+            f"Unknown spectrum {job['spectrum']!r} (available: {', '.join(SPECTRUM_MODES)})"
+        )
+    elif job["spectrum"] != "off" and job["audio"] is None:
+        problems.append("The spectrum needs an audio file.")
+    if job["beats"] is not None:
+        try:
+            with open(job["beats"], "r") as f:
+                [float(beat) for beat in json.load(f)]
+        except (OSError, ValueError, TypeError) as e:
+            problems.append(f"Could not read beats from {job['beats']}: {e}")
+    if job["staff_names"] is not None:
+        from karaoke.styles import load_staff_names
+
+        try:
+            load_staff_names(job["staff_names"])
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            problems.append(
+                f"Could not read staff names from {job['staff_names']}: {e}"
+            )
+
+    T_total = None
+    if job["audio"] is not None:
+        try:
+            T_total = probe_audio(job["audio"])[1]
+        except (OSError, RuntimeError) as e:
+            problems.append(str(e))
+    elif relevant_lines:
+        T_total = max(time_tuple[1] for (time_tuple, _) in relevant_lines)
+    if T_total is not None and T_total <= dynamic_start:
+        problems.append(
+            "Audio duration is too short (must be more than static+transition seconds)."
+        )
+    if problems:
+        raise RuntimeError("Invalid job:\n  " + "\n  ".join(problems))
+
+    fps = job["fps"]
+    num_composites = (len(staff_images) + 1) // 2
+    cycle_length, scroll_speed = scroll_params(num_composites, T_total)
+    benchmark = load_benchmark(job["backend"])
+    phases = []
+    for name, start, end in phase_bounds(T_total):
+        first, last = frame_at(start, fps), frame_at(end, fps)
+        phases.append(
+            {
+                "name": name,
+                "start": start,
+                "end": end,
+                "first_frame": first,
+                "frames": last - first,
+                "est_seconds": (last - first) / benchmark[name],
+            }
+        )
+    return {
+        "T_total": T_total,
+        "fps": fps,
+        "nframes": frame_at(T_total, fps),
+        "subtitles": len(relevant_lines),
+        "staff_images": len(staff_images),
+        "num_composites": num_composites,
+        "cycle_length": cycle_length,
+        "scroll_speed": scroll_speed,
+        "phases": phases,
+        "est_seconds": sum(phase["est_seconds"] for phase in phases),
+    }
+
+
+def format_plan(plan):
+    lines = [
+        f"Duration: {plan['T_total']:.2f} sec at {plan['fps']} fps "
+        f"({plan['nframes']} frames)",
+        f"Subtitles: {plan['subtitles']}, staff images: {plan['staff_images']} "
+        f"({plan['num_composites']} composites)",
+        f"Scroll speed: {plan['scroll_speed']:.2f} pixels/sec "
+        f"(cycle_length = {plan['cycle_length']}px)",
+        "",
+        f"{'phase':<12}{'start':>9}{'end':>9}{'frames':>9}{'est. render':>14}",
+    ]
+    for phase in plan["phases"]:
+        lines.append(
+            f"{phase['name']:<12}{phase['start']:>9.2f}{phase['end']:>9.2f}"
+            f"{phase['frames']:>9}{phase['est_seconds']:>13.1f}s"
+        )
+    lines.append(f"Estimated render time: {plan['est_seconds']:.1f}s")
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from karaoke.config import bg_height, width
+from karaoke.subtitles import parse_subtitles
+
+# Output formats: file extension and the PIL options for each.
+IMAGE_FORMATS = {
+    "webp": (".webp", {"format": "WEBP", "method": 4}),
+    "jpeg": (".jpg", {"format": "JPEG", "optimize": True, "progressive": True}),
+}
+# Bumped whenever the resizing changes, so that existing outputs are redone.
+PIPELINE_VERSION = 2
+# The kenburns style draws each photo with objectFit cover over the staff area
+# and zooms in to 1.15x (ScrollingPhase.tsx); no layout draws a photo larger.
+KENBURNS_ZOOM = 1.15
+COVER_SIZE = (math.ceil(width * KENBURNS_ZOOM), math.ceil(bg_height * KENBURNS_ZOOM))
+
+
+# ---------------------------
+# Remotion Asset Preparation
+# ---------------------------
+# The Remotion composition shows staff photos at most over the staff area,
+# zoomed by kenburns, but the captures from 390_course_staff.py are several
+# times larger, and Chromium decodes them again for every rendered frame. This
+# step writes each photo downscaled just enough to still cover that box (never
+# upscaled, so a portrait keeps its full width) in a compact format,
+# plus a JSON manifest of the staff and parsed subtitles that Root.tsx imports.
+# Outputs are named after the hash of the source bytes and the settings, so
+# unchanged photos are skipped on later runs.
+def output_name(source, digest, image_format):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f"{stem}-{digest[:12]}{IMAGE_FORMATS[image_format][0]}"
+
+
+def source_digest(path, settings):
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def optimize_image(source, output, size, image_format, quality):
+    """Downscale source to cover size and write it; returns the output (width, height).
+
+    Like objectFit cover, the photo is scaled so that both sides are at least
+    the box's, and images already smaller in either side are kept as they are.
+    """
+    from PIL import Image
+
+    img = Image.open(source)
+    has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+    img = img.convert("RGBA" if has_alpha and image_format == "webp" else "RGB")
+    scale = max(size[0] / img.size[0], size[1] / img.size[1])
+    if scale < 1:
+        img = img.resize(
+            (math.ceil(img.size[0] * scale), math.ceil(img.size[1] * scale)),
+            Image.LANCZOS,
+        )
+    options = dict(IMAGE_FORMATS[image_format][1], quality=quality)
+    # Written under a temporary name so an interrupted run never leaves a
+    # truncated file that later runs would take as done.
+    tmp_path = output + ".tmp"
+    img.save(tmp_path, **options)
+    os.replace(tmp_path, output)
+    return img.size
+
+
+def image_size(path):
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return img.size
+
+
+def prepare_assets(
+    staff_list,
+    public_dir,
+    subtitle_file,
+    manifest_path,
+    out_dir="staff/optimized",
+    size=COVER_SIZE,
+    image_format="webp",
+    quality=82,
+    workers=None,
+):
+    """Optimize the staff photos listed in staff_list and write the manifest.
+
+    staff_list is a JSON list of {"image", "name"} with images relative to
+    public_dir, like the paths passed to staticFile().
+    """
+    with open(staff_list, "r") as f:
+        staff = json.load(f)
+    settings = [PIPELINE_VERSION, list(size), image_format, quality]
+    target_dir = os.path.join(public_dir, out_dir)
+    os.makedirs(target_dir, exist_ok=True)
+
+    outputs = {}  # source image -> name of the optimized file
+    for member in staff:
+        image = member["image"]
+        if image not in outputs:
+            digest = source_digest(os.path.join(public_dir, image), settings)
+            outputs[image] = output_name(image, digest, image_format)
+    todo = {
+        image: name
+        for image, name in outputs.items()
+        if not os.path.isfile(os.path.join(target_dir, name))
+    }
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    optimize_image,
+                    os.path.join(public_dir, image),
+                    os.path.join(target_dir, name),
+                    size,
+                    image_format,
+                    quality,
+                )
+                for image, name in todo.items()
+            ]
+            for future in futures:
+                future.result()
+    print(
+        f"{len(todo)} of {len(outputs)} staff images optimized, "
+        f"{len(outputs) - len(todo)} unchanged"
+    )
+
+    # Optimized files no longer referenced are from replaced or removed photos.
+    for name in os.listdir(target_dir):
+        if name not in outputs.values() and not name.endswith(".tmp"):
+            os.remove(os.path.join(target_dir, name))
+
+    manifest = {
+        "width": size[0],
+        "height": size[1],
+        "staff": [],
+        "subtitles": [
+            {"start": round(start, 3), "end": round(end, 3), "text": text.strip()}
+            for (start, end), text in parse_subtitles(subtitle_file)
+        ],
+    }
+    for member in staff:
+        name = outputs[member["image"]]
+        w, h = image_size(os.path.join(target_dir, name))
+        manifest["staff"].append(
+            {
+                "image": f"{out_dir}/{name}",
+                "name": member["name"],
+                "width": w,
+                "height": h,
+            }
+        )
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m karaoke.remotion_assets",
+        description="Downscale the Remotion staff photos and write the asset manifest",
+    )
+    parser.add_argument(
+        "--staff",
+        default="remotion/staff.json",
+        help="JSON list of staff members (default: remotion/staff.json)",
+    )
+    parser.add_argument(
+        "--public",
+        default="remotion/public",
+        help="Remotion public folder the image paths are relative to",
+    )
+    parser.add_argument(
+        "--subtitles", default="390lyrics.srt", help="*.srt file for the manifest"
+    )
+    parser.add_argument(
+        "--manifest",
+        default="remotion/src/assets.json",
+        help="manifest written for Root.tsx (default: remotion/src/assets.json)",
+    )
+    parser.add_argument(
+        "--format", default="webp", choices=sorted(IMAGE_FORMATS), dest="image_format"
+    )
+    parser.add_argument(
+        "--quality", type=int, default=82, help="encoder quality (default: 82)"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+    prepare_assets(
+        args.staff,
+        args.public,
+        args.subtitles,
+        args.manifest,
+        image_format=args.image_format,
+        quality=args.quality,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
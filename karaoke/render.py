@@ -0,0 +1,464 @@
+import time as timer
+from functools import lru_cache
+
+import cairo
+import numpy as np
+from tqdm import tqdm
+
+from karaoke.assets import list_staff_images, load_cover_canvas, load_staff_canvases
+from karaoke.checkpoint import Checkpoint
+from karaoke.config import (
+    DEFAULT_JOB,
+    bar_height,
+    credits_start_time,
+    dynamic_start,
+    height,
+    static_duration,
+    static_fade_duration,
+    transition_duration,
+    width,
+)
+from karaoke.encode import FFmpegWriter
+from karaoke.plan import make_plan, save_benchmark, scroll_params
+from karaoke.spectrum import job_spectrum, paint_spectrum
+from karaoke.styles import (
+    build_sprites,
+    compile_layers,
+    load_beats,
+    load_staff_names,
+    paint_layers,
+)
+from karaoke.subtitles import parse_subtitles
+from karaoke.timeline import CREDITS, SCROLL, STATIC, TRANSITION, compile_timeline
+
+
+# ---------------------------
+# Text Sprites
+# ---------------------------
+# The gradient bar with its centered text only depends on the text, so each
+# distinct title/subtitle is rasterized once and pasted on every later frame.
+@lru_cache(maxsize=1024)
+def bar_sprite(text):
+    sprite = np.zeros((bar_height, width, 4), dtype=np.uint8)
+    surface = cairo.ImageSurface.create_for_data(
+        memoryview(sprite).cast("B"), cairo.FORMAT_ARGB32, width, bar_height, width * 4
+    )
+    context = cairo.Context(surface)
+    gradient = cairo.LinearGradient(0, 0, width, 0)
+    gradient.add_color_stop_rgb(0, 198 / 255, 22 / 255, 141 / 255)
+    gradient.add_color_stop_rgb(0.5, 102 / 255, 45 / 255, 145 / 255)
+    gradient.add_color_stop_rgb(1, 0, 161 / 255, 199 / 255)
+    context.rectangle(0, 0, width, bar_height)
+    context.set_source(gradient)
+    context.fill()
+    if text:
+        context.select_font_face(
+            "Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL
+        )
+        context.set_font_size(40)
+        context.set_source_rgb(1, 1, 1)
+        te = context.text_extents(text)
+        x_text = (width - te.width) / 2 - te.x_bearing
+        y_text = (bar_height - te.height) / 2 - te.y_bearing
+        context.move_to(x_text, y_text)
+        context.show_text(text)
+    surface.flush()
+    return sprite
+
+
+@lru_cache(maxsize=1024)
+def bar_surface(text):
+    # The surface keeps its sprite array alive, so it can outlive bar_sprite's cache entry.
+    return canvas_surface(bar_sprite(text))
+
+
+# ---------------------------
+# Helper Functions: Cairo <-> NumPy
+# ---------------------------
+def canvas_surface(canvas):
+    canvas_height, canvas_width = canvas.shape[:2]
+    return cairo.ImageSurface.create_for_data(
+        memoryview(canvas).cast("B"),
+        cairo.FORMAT_ARGB32,
+        canvas_width,
+        canvas_height,
+        canvas_width * 4,
+    )
+
+
+def surface_pixels(surface):
+    """(height, width, 4) BGRA view of a surface's memory; no copy."""
+    return np.frombuffer(surface.get_data(), np.uint8).reshape(
+        (surface.get_height(), surface.get_width(), 4)
+    )
+
+
+def get_npimage(surface, width, height, transparent=False, y_origin="top"):
+    im = np.frombuffer(surface.get_data(), np.uint8).reshape((height, width, 4))
+    # Cairo stores pixels as BGRA; reorder to RGBA.
+    im = im[:, :, [2, 1, 0, 3]]
+    if y_origin == "bottom":
+        im = im[::-1]
+    return im if transparent else im[:, :, :3]
+
+
+# ---------------------------
+# Frame Surface Pool
+# ---------------------------
+# Pixel format of Renderer.render_frame output, as passed to FFmpegWriter.
+FRAME_PIX_FMT = "bgra"
+
+
+class SurfacePool:
+    """Ring of preallocated frame surfaces, each with a context and a pixel view.
+
+    A frame returned from a slot stays valid until the ring wraps around, which
+    is plenty for a writer that consumes every frame before the next is drawn.
+    """
+
+    def __init__(self, size=2):
+        self.slots = []
+        for _ in range(size):
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            self.slots.append(
+                (surface, cairo.Context(surface), surface_pixels(surface))
+            )
+        self.next_slot = 0
+
+    def acquire(self):
+        """Next slot as (surface, context, pixels), cleared to transparent black."""
+        slot = self.slots[self.next_slot]
+        self.next_slot = (self.next_slot + 1) % len(self.slots)
+        context = slot[1]
+        context.save()
+        context.set_operator(cairo.OPERATOR_CLEAR)
+        context.paint()
+        context.restore()
+        return slot
+
+
+# ---------------------------
+# Frame Renderer (Static Logo, Transition, Scrolling, and Credits)
+# ---------------------------
+class Renderer:
+    def __init__(
+        self,
+        logo_canvas,
+        credits_canvas,
+        background_images,
+        relevant_lines,
+        T_total,
+        title,
+        style="scroll",
+        staff_paths=(),
+        staff_names=None,
+        beats=(),
+        spectrum="off",
+    ):
+        if T_total <= dynamic_start:
+            raise RuntimeError(
+                "Audio duration is too short (must be more than static+transition seconds)."
+            )
+        self.logo_canvas = logo_canvas
+        self.credits_canvas = credits_canvas
+        self.background_images = background_images
+        self.relevant_lines = relevant_lines
+        self.T_total = T_total
+        self.title = title
+        self.num_composites = len(background_images)
+        self.cycle_length, self.scroll_speed = scroll_params(
+            self.num_composites, T_total
+        )
+        self.style = style
+        self.beats = beats
+        self.spectrum = spectrum
+        self.sprites, self.num_members = build_sprites(style, staff_paths, staff_names)
+        self.timeline = None  # set by build_renderer for frame-number rendering
+
+        # The canvases are wrapped in cairo surfaces once; frames only paint them.
+        self.logo_surface = canvas_surface(logo_canvas)
+        self.credits_surface = canvas_surface(credits_canvas)
+        self.background_surfaces = [canvas_surface(c) for c in background_images]
+        # The transition fades out of the logo with its title, which never changes.
+        self.intro_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        context = cairo.Context(self.intro_surface)
+        context.set_source_surface(self.logo_surface, 0, 0)
+        context.paint()
+        self.paint_bar(context, title)
+        self.pool = SurfacePool()
+        # Scratch surface for the frame the transition fades into.
+        self.scratch = SurfacePool(1)
+
+    def subtitle_at(self, time):
+        for (start, end), text in self.relevant_lines:
+            if start <= time < end:
+                return text
+        return ""
+
+    def paint_bar(self, context, text):
+        context.set_source_surface(bar_surface(text), 0, 0)
+        context.paint()
+
+    def layers_at(self, time):
+        """Staff sprite layers of the animation style at a time, or None for "scroll".
+
+        Grid pop-ins are counted in whole frames, so this needs the timeline's fps.
+        """
+        if self.style == "scroll":
+            return None
+        return compile_layers(
+            self.style,
+            [max(time - dynamic_start, 0)],
+            self.num_members,
+            min(credits_start_time, self.T_total) - dynamic_start,
+            self.beats,
+            self.timeline.fps,
+        )[0]
+
+    def paint_staff(self, context, current_index, x_offset, layers):
+        if layers is None:
+            self.paint_backgrounds(context, current_index, x_offset)
+            return
+        context.set_source_rgb(0, 0, 0)
+        context.rectangle(0, bar_height, width, height - bar_height)
+        context.fill()
+        paint_layers(context, self.sprites, layers)
+
+    def paint_backgrounds(self, context, current_index, x_offset):
+        current_surface = self.background_surfaces[current_index]
+        next_surface = self.background_surfaces[
+            (current_index + 1) % self.num_composites
+        ]
+        context.set_source_surface(current_surface, x_offset, bar_height)
+        context.paint()
+        context.set_source_surface(next_surface, x_offset + width, bar_height)
+        context.paint()
+
+    def state_at(self, time):
+        """(phase, alpha, index, offset, text) at a time; see karaoke.timeline."""
+        if time < static_duration:
+            if time < static_fade_duration:
+                alpha = time / static_fade_duration
+            else:
+                alpha = 1.0
+            return STATIC, alpha, 0, 0, self.title
+        elif time < dynamic_start:
+            t_norm = (time - static_duration) / transition_duration  # 0 to 1
+            return TRANSITION, t_norm, 0, 0, self.subtitle_at(time)
+        elif time < credits_start_time:
+            t_dynamic = time - dynamic_start
+            pos = (self.scroll_speed * t_dynamic) % self.cycle_length
+            return SCROLL, 1.0, int(pos // width), pos % width, self.subtitle_at(time)
+        else:
+            return CREDITS, 1.0, 0, 0, ""
+
+    def draw_frame(self, time):
+        """Reference path: a freshly allocated RGB frame at a time.
+
+        The audio spectrum is per frame, so it is only drawn by render_frame.
+        """
+        return self.draw_state(*self.state_at(time), self.layers_at(time))
+
+    def render_frame(self, n):
+        """Draw frame n from the precompiled timeline into the surface pool.
+
+        Returns a BGRA view of the pooled surface (see FRAME_PIX_FMT), valid until
+        the pool wraps around; nothing frame-sized is allocated. No other state
+        is carried between calls.
+        """
+        tl = self.timeline
+        phase = tl.phase[n]
+        text = self.title if phase == STATIC else tl.text(n)
+        layers = tl.layers[n] if tl.layers is not None else None
+        _, context, pixels = self.pool.acquire()
+        self.paint_state(
+            context, phase, tl.alpha[n], tl.index[n], tl.offset[n], text, layers
+        )
+        if tl.spectrum is not None:
+            paint_spectrum(context, tl.spectrum[n], self.spectrum)
+        return pixels
+
+    def draw_state(self, phase, alpha, current_index, offset, text, layers=None):
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        self.paint_state(
+            cairo.Context(surface), phase, alpha, current_index, offset, text, layers
+        )
+        return get_npimage(surface, width, height)
+
+    def paint_state(self, context, phase, alpha, current_index, offset, text, layers):
+        """Paint one frame onto a context whose surface is transparent black."""
+        if phase == STATIC:
+            # Static phase: display the static logo with fade-in.
+            context.set_source_rgb(0, 0, 0)
+            context.rectangle(0, 0, width, height)
+            context.fill()
+            context.set_source_surface(self.logo_surface, 0, 0)
+            context.paint_with_alpha(alpha)
+            # Draw gradient bar and welcome message.
+            self.paint_bar(context, text)
+
+        elif phase == TRANSITION:
+            # Transition phase: blend static logo and dynamic scrolling frame.
+            # Generate dynamic frame at initial dynamic state (t_dynamic = 0).
+            dynamic_surface, dynamic_ctx, _ = self.scratch.acquire()
+            self.paint_staff(dynamic_ctx, 0, 0, layers)
+            self.paint_bar(dynamic_ctx, text)
+            # Both frames are opaque, so painting the dynamic one over the static
+            # one with alpha blends them as (1 - alpha) * static + alpha * dynamic.
+            context.set_source_surface(self.intro_surface, 0, 0)
+            context.paint()
+            context.set_source_surface(dynamic_surface, 0, 0)
+            context.paint_with_alpha(alpha)
+
+        elif phase == SCROLL:
+            # Dynamic scrolling phase.
+            self.paint_staff(context, current_index, -offset, layers)
+            self.paint_bar(context, text)
+
+        else:
+            # Credits phase: display the static credits image.
+            context.set_source_surface(self.credits_surface, 0, 0)
+            context.paint()
+            # Optionally, draw the gradient bar at the top.
+            self.paint_bar(context, "")
+
+
+# ---------------------------
+# Render One Job
+# ---------------------------
+def build_renderer(job, plan):
+    renderer = Renderer(
+        load_cover_canvas(job["logo"]),
+        load_cover_canvas(job["credits"]),
+        load_staff_canvases(job["staff_dir"]),
+        parse_subtitles(job["subtitle_file"]),
+        plan["T_total"],
+        job["title"],
+        style=job["style"],
+        staff_paths=list_staff_images(job["staff_dir"]),
+        staff_names=load_staff_names(job["staff_names"]),
+        beats=load_beats(job["beats"]),
+        spectrum=job["spectrum"],
+    )
+    # Compiled from the loaded canvases, in case some staff images failed to decode.
+    renderer.timeline = compile_timeline(
+        plan["nframes"],
+        plan["fps"],
+        plan["T_total"],
+        renderer.num_composites,
+        renderer.relevant_lines,
+        style=renderer.style,
+        num_members=renderer.num_members,
+        beats=renderer.beats,
+        spectrum=job_spectrum(job, plan),
+    )
+    return renderer
+
+
+def write_frames(renderer, writer, plan, first, last, bar, phase_time):
+    """Render frames [first, last) into writer, timing each phase for the benchmark."""
+    for phase in plan["phases"]:
+        lo = max(first, phase["first_frame"])
+        hi = min(last, phase["first_frame"] + phase["frames"])
+        if lo >= hi:
+            continue
+        phase_start = timer.perf_counter()
+        for n in range(lo, hi):
+            writer.write_frame(renderer.render_frame(n))
+            bar.update()
+        seconds, frames = phase_time.get(phase["name"], (0.0, 0))
+        phase_time[phase["name"]] = (
+            seconds + timer.perf_counter() - phase_start,
+            frames + hi - lo,
+        )
+
+
+def render_segments(job, plan, bar, phase_time):
+    """Render in resumable segments, skipping the ones a previous run finished."""
+    if job["renditions"] or job["spool"]:
+        raise RuntimeError("Segmented renders do not support renditions or a spool.")
+    checkpoint = Checkpoint(job, plan["nframes"])
+    bar.update(checkpoint.frames_done)
+    renderer = None
+    for index, first, last in checkpoint.pending():
+        # Decode assets only if there is something left to render.
+        if renderer is None:
+            renderer = build_renderer(job, plan)
+        with FFmpegWriter(
+            checkpoint.partial_path(index),
+            (width, height),
+            plan["fps"],
+            profile=job["profile"],
+            pix_fmt=FRAME_PIX_FMT,
+        ) as writer:
+            write_frames(renderer, writer, plan, first, last, bar, phase_time)
+        checkpoint.mark_done(index)
+    checkpoint.finish()
+
+
+def render(job, progress=True):
+    """Render one job and return its frame count and wall-clock throughput."""
+    job = {**DEFAULT_JOB, **job}
+    start = timer.perf_counter()
+    # Validate everything before any asset is decoded.
+    plan = make_plan(job)
+    if progress:
+        print(
+            f"Computed scroll speed: {plan['scroll_speed']:.2f} pixels/sec (cycle_length = {plan['cycle_length']}px, dynamic duration = {plan['T_total'] - dynamic_start:.2f} sec)"
+        )
+
+    phase_time = {}  # phase name -> (seconds, frames)
+    with tqdm(total=plan["nframes"], unit="frame", disable=not progress) as bar:
+        if job["vfr"]:
+            from karaoke.vfr import render_vfr
+
+            renderer = build_renderer(job, plan)
+            render_vfr(job, plan, renderer, bar, phase_time)
+        elif job["backend"] == "ffmpeg":
+            from karaoke.filtergraph import render_filtergraph
+
+            if job["spool"]:
+                raise RuntimeError("The ffmpeg backend does not support a spool.")
+
+            renderer = build_renderer(job, plan)
+            render_filtergraph(job, plan, renderer, bar, phase_time)
+        elif job["segment_seconds"]:
+            render_segments(job, plan, bar, phase_time)
+        else:
+            renderer = build_renderer(job, plan)
+            # Frames are rendered once and piped to a single ffmpeg process, which
+            # also reads the audio file directly, so concurrent renders never share
+            # temp files.
+            with FFmpegWriter(
+                job["output"],
+                (width, height),
+                plan["fps"],
+                profile=job["profile"],
+                audio=job["audio"],
+                renditions=job["renditions"],
+                pix_fmt=FRAME_PIX_FMT,
+                spool=job["spool"],
+            ) as writer:
+                write_frames(
+                    renderer, writer, plan, 0, plan["nframes"], bar, phase_time
+                )
+            if job["spool"]:
+                # Written only once the spool is complete.
+                from karaoke.spool import write_sidecar
+
+                write_sidecar(job["spool"], job, plan)
+    phase_fps = {
+        name: frames / seconds for name, (seconds, frames) in phase_time.items()
+    }
+    save_benchmark(job["backend"], phase_fps)
+    if progress:
+        for name, rate in phase_fps.items():
+            print(f"{name}: {rate:.1f} fps")
+
+    elapsed = timer.perf_counter() - start
+    return {
+        "output": job["output"],
+        "frames": plan["nframes"],
+        "seconds": elapsed,
+        "fps": plan["nframes"] / elapsed,
+    }
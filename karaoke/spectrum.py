@@ -0,0 +1,123 @@
+import subprocess
+
+import numpy as np
+
+from karaoke.config import bar_height, height, width
+from karaoke.encode import ffmpeg_exe
+
+# ---------------------------
+# Audio Spectrum
+# ---------------------------
+# Band levels for every output frame are computed once before rendering: the
+# audio is decoded through an ffmpeg pipe in chunks, and each chunk's frames
+# get a Hann-windowed FFT centered on the frame time, summed into log-spaced
+# bands. The result is a (frames, bands) float16 array of levels in [0, 1], so
+# drawing a frame's spectrum is one filled path of rectangles.
+SAMPLE_RATE = 22050
+WINDOW = 2048  # samples per FFT, about 93 ms
+SPECTRUM_BANDS = 32
+BAND_RANGE = (50.0, 10000.0)  # Hz
+DYNAMIC_RANGE = 60.0  # dB below the loudest band that still shows
+CHUNK_SECONDS = 2.0
+
+FOOTER_HEIGHT = 64
+SPECTRUM_ALPHA = {"bar": 0.35, "footer": 0.6}
+
+
+def decode_chunks(path, rate=SAMPLE_RATE, chunk_seconds=CHUNK_SECONDS):
+    """Yield the audio as mono float32 chunks without decoding it all at once."""
+    proc = subprocess.Popen(
+        [ffmpeg_exe(), "-v", "error", "-i", path]
+        + ["-vn", "-ac", "1", "-ar", str(rate), "-f", "f32le", "-"],
+        stdout=subprocess.PIPE,
+    )
+    chunk_bytes = int(rate * chunk_seconds) * 4
+    try:
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[: len(data) // 4 * 4], np.float32)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"Could not decode audio from {path}")
+
+
+def band_bins(bands, rate=SAMPLE_RATE, window=WINDOW):
+    """FFT bin edges of log-spaced bands, each at least one bin wide."""
+    low, high = BAND_RANGE
+    high = min(high, rate / 2)
+    edges = np.round(np.geomspace(low, high, bands + 1) * window / rate).astype(int)
+    for i in range(1, len(edges)):
+        edges[i] = max(edges[i], edges[i - 1] + 1)
+    return edges
+
+
+def band_power(samples, starts, edges, window=WINDOW):
+    """Mean power per band of the windows samples[start:start + window]."""
+    frames = samples[starts[:, None] + np.arange(window)] * np.hanning(window)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    summed = np.add.reduceat(power[:, : edges[-1]], edges[:-1], axis=1)
+    return summed / np.diff(edges)
+
+
+def compute_spectrum(path, nframes, fps, bands=SPECTRUM_BANDS):
+    """(nframes, bands) float16 levels in [0, 1], frame n centered at n / fps."""
+    edges = band_bins(bands)
+    half = WINDOW // 2
+    starts = np.round(np.arange(nframes) * SAMPLE_RATE / fps).astype(np.int64) - half
+    power = np.zeros((nframes, bands), dtype=np.float32)
+
+    # buffer holds samples from buffer_start on; before 0 and after the end is silence.
+    buffer = np.zeros(half, dtype=np.float32)
+    buffer_start = -half
+    done = 0
+    for chunk in decode_chunks(path):
+        buffer = np.concatenate([buffer, chunk])
+        ready = np.searchsorted(starts + WINDOW, buffer_start + len(buffer), "right")
+        if ready > done:
+            power[done:ready] = band_power(
+                buffer, starts[done:ready] - buffer_start, edges
+            )
+            done = ready
+        # Keep only the samples that frames still to come need.
+        keep_from = starts[done] if done < nframes else buffer_start + len(buffer)
+        drop = max(keep_from - buffer_start, 0)
+        buffer = buffer[drop:]
+        buffer_start += drop
+    if done < nframes:
+        missing = starts[-1] + WINDOW - (buffer_start + len(buffer))
+        buffer = np.concatenate([buffer, np.zeros(max(missing, 0), np.float32)])
+        power[done:] = band_power(buffer, starts[done:] - buffer_start, edges)
+
+    db = 10 * np.log10(power + 1e-12)
+    ceiling = np.percentile(db, 99.5)
+    levels = np.clip((db - (ceiling - DYNAMIC_RANGE)) / DYNAMIC_RANGE, 0, 1)
+    return levels.astype(np.float16)
+
+
+def job_spectrum(job, plan):
+    """Per-frame levels of a job with a spectrum enabled, else None."""
+    if job["spectrum"] == "off":
+        return None
+    return compute_spectrum(job["audio"], plan["nframes"], plan["fps"])
+
+
+# ---------------------------
+# Drawing
+# ---------------------------
+def paint_spectrum(context, levels, mode):
+    """One translucent white column per band, rising from the bottom of the
+    gradient bar ("bar") or of the frame ("footer")."""
+    base, max_height = (
+        (bar_height, bar_height) if mode == "bar" else (height, FOOTER_HEIGHT)
+    )
+    slot = width / len(levels)
+    column = slot * 0.7
+    for i, level in enumerate(levels.tolist()):
+        h = level * max_height
+        if h >= 0.5:
+            context.rectangle(i * slot + (slot - column) / 2, base - h, column, h)
+    context.set_source_rgba(1, 1, 1, SPECTRUM_ALPHA[mode])
+    context.fill()
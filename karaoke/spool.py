@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import sys
+
+from karaoke.config import height, width
+from karaoke.encode import ENCODE_PROFILES, RENDITIONS, FFmpegWriter
+
+SPOOL_VERSION = 1
+
+
+# ---------------------------
+# Frame Spool
+# ---------------------------
+# A render can also write its frames to a lossless spool: FFV1 in Matroska,
+# every frame a keyframe (see encode.spool_args), next to a small JSON sidecar
+# with the frame rate, size, phases and audio of the job. Trying another
+# profile, rendition ladder or excerpt then only decodes the spool, which runs
+# at disk and encoder speed instead of drawing every frame again, and seeking
+# to any time is exact because no frame depends on another.
+def sidecar_path(spool):
+    return spool + ".json"
+
+
+def write_sidecar(spool, job, plan):
+    info = {
+        "version": SPOOL_VERSION,
+        "fps": plan["fps"],
+        "width": width,
+        "height": height,
+        "nframes": plan["nframes"],
+        "audio": os.path.abspath(job["audio"]) if job["audio"] else None,
+        "phases": plan["phases"],
+    }
+    tmp_path = sidecar_path(spool) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp_path, sidecar_path(spool))
+    return info
+
+
+def load_sidecar(spool):
+    if not os.path.isfile(spool):
+        raise RuntimeError(f"Spool {spool} not found.")
+    try:
+        with open(sidecar_path(spool), "r") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        raise RuntimeError(
+            f"{sidecar_path(spool)} is missing or unreadable; "
+            "the spool's render did not finish."
+        )
+    if info.get("version") != SPOOL_VERSION:
+        raise RuntimeError(f"{spool} was written by another version; render it again.")
+    return info
+
+
+class SpoolEncoder(FFmpegWriter):
+    """Encode a time range of a spool like the render that wrote it would have.
+
+    Both the spool and the audio are opened with the same input seek, so an
+    excerpt stays in sync. Nothing is piped in; encode() waits for ffmpeg.
+    """
+
+    def __init__(
+        self,
+        source,
+        output,
+        start=None,
+        end=None,
+        profile="web",
+        audio=None,
+        renditions=None,
+    ):
+        self.source = source
+        self.info = load_sidecar(source)
+        duration = self.info["nframes"] / self.info["fps"]
+        self.start = start or 0.0
+        self.end = duration if end is None else min(end, duration)
+        if not 0 <= self.start < self.end:
+            raise RuntimeError(
+                f"Empty time range {self.start:.3f}-{self.end:.3f}s "
+                f"(the spool is {duration:.3f}s long)."
+            )
+        super().__init__(
+            output,
+            (self.info["width"], self.info["height"]),
+            self.info["fps"],
+            profile=profile,
+            audio=audio,
+            renditions=renditions,
+        )
+
+    def _range_args(self):
+        return ["-ss", f"{self.start:.6f}", "-t", f"{self.end - self.start:.6f}"]
+
+    def _input_args(self):
+        return ["-nostdin"] + self._range_args() + ["-i", self.source]
+
+    def _audio_input_args(self):
+        return self._range_args() + ["-i", self.audio]
+
+    def encode(self):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m karaoke.spool",
+        description="Encode a frame spool written with main.py --spool",
+    )
+    parser.add_argument("spool", help="*.mkv spool written by a render")
+    parser.add_argument("-o", "--output", required=True, help="output video file")
+    parser.add_argument(
+        "-p",
+        "--profile",
+        default="web",
+        choices=sorted(ENCODE_PROFILES),
+        help="encoder tuning profile (default: web)",
+    )
+    parser.add_argument(
+        "-r",
+        "--renditions",
+        default=None,
+        help=f"comma-separated renditions (available: {', '.join(RENDITIONS)})",
+    )
+    parser.add_argument(
+        "-a",
+        "--audio",
+        default=None,
+        help="audio to mux (default: the audio of the render that wrote the spool)",
+    )
+    parser.add_argument("--no-audio", action="store_true", help="encode the video only")
+    parser.add_argument(
+        "--start", type=float, default=None, help="first second to encode"
+    )
+    parser.add_argument(
+        "--end", type=float, default=None, help="second to stop encoding at"
+    )
+    args = parser.parse_args(argv)
+    renditions = args.renditions.split(",") if args.renditions else None
+    for name in renditions or []:
+        if name not in RENDITIONS:
+            parser.error(f"unknown rendition {name!r}")
+
+    try:
+        info = load_sidecar(args.spool)
+        audio = None if args.no_audio else args.audio or info["audio"]
+        SpoolEncoder(
+            args.spool,
+            args.output,
+            start=args.start,
+            end=args.end,
+            profile=args.profile,
+            audio=audio,
+            renditions=renditions,
+        ).encode()
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from karaoke.config import bar_height, bg_height, dynamic_start, width
+
+# ---------------------------
+# Animation Styles
+# ---------------------------
+# Python ports of the staff animations in remotion/src/components/ScrollingPhase.tsx.
+# "scroll" is the composite-canvas pan drawn by Renderer.paint_backgrounds; the
+# other styles are compiled into per-frame layers, each a cached card sprite
+# drawn with a cairo transform:
+#   sprite id, center x, center y (in the background area), scale, rotation (rad), opacity
+LAYER_FIELDS = 6
+
+BOB_DURATION = 0.45  # seconds a beat bob lasts
+BOB_MAX_ANGLE = 6  # peak rotation in degrees
+
+KENBURNS_OVERLAP = 0.5  # seconds of crossfade between photos
+KENBURNS_LABEL_HEIGHT = 40
+
+POLAROID_MAX_VISIBLE = 15
+POLAROID_PHOTO = (220, 260)
+POLAROID_CARD = (POLAROID_PHOTO[0] + 24, POLAROID_PHOTO[1] + 60)
+POLAROID_SHADOW = 16  # padding around the card for its shadow
+POLAROID_APPEAR = 0.3  # seconds for the scale-up entrance
+
+GRID_COLS, GRID_ROWS = 7, 4
+GRID_PAGE_FADE = 0.5
+GRID_SPRING = {"damping": 12, "stiffness": 200, "mass": 0.8}
+
+
+def seed_random(seed):
+    x = np.sin(np.asarray(seed, dtype=np.float64) * 127.1 + 311.7) * 43758.5453
+    return x - np.floor(x)
+
+
+def load_beats(path):
+    """Beat times (seconds from the start of the audio), e.g. remotion/src/utils/beats.json."""
+    if path is None:
+        return np.zeros(0)
+    with open(path, "r") as f:
+        return np.sort(np.asarray(json.load(f), dtype=np.float64))
+
+
+def beat_bob(t_dynamic, card_index, beats):
+    """Rotation in degrees of a card bobbing after the most recent beat."""
+    phase_beats = np.asarray(beats, dtype=np.float64) - dynamic_start
+    phase_beats = phase_beats[phase_beats >= 0]
+    if len(phase_beats) == 0:
+        return np.zeros_like(t_dynamic)
+    last = np.searchsorted(phase_beats, t_dynamic, side="right") - 1
+    elapsed = np.where(last >= 0, t_dynamic - phase_beats[np.maximum(last, 0)], np.inf)
+    progress = np.minimum(elapsed / BOB_DURATION, 1.0)
+    decay = 1 - progress * progress
+    # Alternating direction per card, with some variation.
+    direction = card_index % 3 - 1
+    direction = np.where(
+        direction == 0, np.where(card_index % 2 == 0, 1, -1), direction
+    )
+    bob = np.sin(progress * math.pi) * decay * BOB_MAX_ANGLE * direction
+    return np.where(elapsed > BOB_DURATION, 0.0, bob)
+
+
+def spring(t, damping, stiffness, mass):
+    """Underdamped spring from 0 to 1 starting at rest (Remotion's spring())."""
+    omega0 = math.sqrt(stiffness / mass)
+    zeta = damping / (2 * math.sqrt(stiffness * mass))
+    omega_d = omega0 * math.sqrt(1 - zeta * zeta)
+    envelope = np.exp(-zeta * omega0 * t)
+    return 1 - envelope * (
+        np.cos(omega_d * t) + zeta * omega0 / omega_d * np.sin(omega_d * t)
+    )
+
+
+# ---------------------------
+# Layer Compilers
+# ---------------------------
+def compile_layers(style, t_dynamic, num_members, duration, beats, fps):
+    """Per-frame layers of shape (frames, slots, LAYER_FIELDS); sprite id -1 is empty."""
+    compiler = {
+        "kenburns": kenburns_layers,
+        "polaroid": polaroid_layers,
+        "grid": grid_layers,
+    }[style]
+    return compiler(
+        np.asarray(t_dynamic, dtype=np.float64), num_members, duration, beats, fps
+    ).astype(np.float32)
+
+
+def empty_layers(nframes, slots):
+    layers = np.zeros((nframes, slots, LAYER_FIELDS))
+    layers[..., 0] = -1
+    return layers
+
+
+def kenburns_layers(td, num_members, duration, beats, fps):
+    # Sprites 0..N-1 are the photos, N..2N-1 their name labels.
+    per_photo = duration / num_members
+    current = np.minimum(np.floor(td / per_photo), num_members - 1)
+    elapsed = td - current * per_photo
+    fade_in = np.clip(elapsed / KENBURNS_OVERLAP, 0, 1)
+    layers = empty_layers(len(td), 4)
+    for slot, idx, opacity in (
+        (0, current - 1, np.where(current >= 1, 1 - fade_in, 0)),
+        (2, current, fade_in),
+    ):
+        progress = np.minimum((td - idx * per_photo) / per_photo, 1)
+        scale = 1.0 + 0.15 * progress
+        pan_x = (seed_random(idx) - 0.5) * 60 * progress
+        pan_y = (seed_random(idx + 100) - 0.5) * 40 * progress
+        valid = idx >= 0
+        layers[:, slot] = np.stack(
+            [
+                np.where(valid, idx, -1),
+                width / 2 + scale * pan_x,
+                bg_height / 2 + scale * pan_y,
+                scale,
+                np.zeros_like(td),
+                opacity,
+            ],
+            axis=-1,
+        )
+        layers[:, slot + 1] = np.stack(
+            [
+                np.where(valid, idx + num_members, -1),
+                np.full_like(td, width / 2),
+                np.full_like(td, bg_height - 20 - KENBURNS_LABEL_HEIGHT / 2),
+                np.ones_like(td),
+                np.zeros_like(td),
+                opacity,
+            ],
+            axis=-1,
+        )
+    return layers
+
+
+def polaroid_layers(td, num_members, duration, beats, fps):
+    per_photo = duration / num_members
+    card_w, card_h = POLAROID_CARD
+    appeared = np.minimum(np.floor(td / per_photo) + 1, num_members)
+    first = np.maximum(appeared - POLAROID_MAX_VISIBLE, 0)
+    layers = empty_layers(len(td), POLAROID_MAX_VISIBLE)
+    for slot in range(POLAROID_MAX_VISIBLE):
+        i = first + slot
+        age = td - i * per_photo
+        opacity = np.ones_like(td)
+        if slot == 0:
+            # The oldest card fades out while the next one appears.
+            fading = appeared > POLAROID_MAX_VISIBLE
+            opacity = np.where(fading, 1 - np.mod(td, per_photo) / per_photo, 1)
+        scale = np.clip(age / POLAROID_APPEAR, 0, 1)
+        x = 40 + seed_random(i * 3) * (width - card_w - 80)
+        y = 20 + seed_random(i * 3 + 1) * (bg_height - card_h - 40)
+        rotation = (seed_random(i * 3 + 2) - 0.5) * 24 + beat_bob(td, i, beats)
+        layers[:, slot] = np.stack(
+            [
+                np.where(i < appeared, i, -1),
+                x + card_w / 2,
+                y + card_h / 2,
+                scale,
+                np.radians(rotation),
+                opacity,
+            ],
+            axis=-1,
+        )
+    return layers
+
+
+def grid_layers(td, num_members, duration, beats, fps):
+    page_size = GRID_COLS * GRID_ROWS
+    cell_w, cell_h = width / GRID_COLS, bg_height / GRID_ROWS
+    per_photo = duration / num_members
+    page_duration = page_size * per_photo
+    total_pages = math.ceil(num_members / page_size)
+    page = np.minimum(np.floor(td / page_duration), total_pages - 1)
+    page_start = page * page_duration
+    page_elapsed = td - page_start
+    until_page_end = (page + 1) * page_duration - td
+    page_opacity = np.where(
+        (page < total_pages - 1) & (until_page_end < GRID_PAGE_FADE),
+        until_page_end / GRID_PAGE_FADE,
+        1,
+    )
+    layers = empty_layers(len(td), page_size)
+    for slot in range(page_size):
+        member = page * page_size + slot
+        appear_time = slot * per_photo
+        # Spring bounce for the pop-in, counted in whole frames as in Remotion.
+        spring_time = (
+            np.maximum(0, td * fps - np.round((page_start + appear_time) * fps)) / fps
+        )
+        scale = np.where(
+            page_elapsed >= appear_time, spring(spring_time, **GRID_SPRING), 0
+        )
+        layers[:, slot] = np.stack(
+            [
+                np.where(member < num_members, member, -1),
+                np.full_like(td, (slot % GRID_COLS + 0.5) * cell_w),
+                np.full_like(td, (slot // GRID_COLS + 0.5) * cell_h),
+                scale,
+                np.zeros_like(td),
+                page_opacity,
+            ],
+            axis=-1,
+        )
+    return layers
+
+
+# ---------------------------
+# Card Sprites
+# ---------------------------
+# Each staff photo is decoded, scaled and decorated once per style; frames only
+# transform and paint the cached cairo surfaces.
+def load_staff_names(path):
+    """Staff names by image file name, from a JSON list of {"image", "name"}.
+
+    This is the format of remotion/staff.json. The staff folder's captures are
+    named element_<i>.png, so the file names are no names; cards of images
+    without an entry have no name on them.
+    """
+    if path is None:
+        return {}
+    with open(path, "r") as f:
+        return {
+            os.path.basename(entry["image"]): str(entry["name"])
+            for entry in json.load(f)
+        }
+
+
+def cover_surface(path, box_width, box_height):
+    """Photo scaled to cover the box (CSS object-fit: cover) as an opaque cairo surface."""
+    import cairo
+    from PIL import Image
+
+    img = Image.open(path).convert("RGB")
+    scale = max(box_width / img.size[0], box_height / img.size[1])
+    new_size = (
+        max(box_width, round(img.size[0] * scale)),
+        max(box_height, round(img.size[1] * scale)),
+    )
+    img = img.resize(new_size, Image.LANCZOS)
+    left = (new_size[0] - box_width) // 2
+    top = (new_size[1] - box_height) // 2
+    img = img.crop((left, top, left + box_width, top + box_height))
+    pixels = np.empty((box_height, box_width, 4), dtype=np.uint8)
+    pixels[..., :3] = np.asarray(img)[:, :, ::-1]
+    pixels[..., 3] = 255
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, box_width, box_height)
+    context = cairo.Context(surface)
+    context.set_source_surface(
+        cairo.ImageSurface.create_for_data(
+            memoryview(pixels).cast("B"),
+            cairo.FORMAT_ARGB32,
+            box_width,
+            box_height,
+            box_width * 4,
+        ),
+        0,
+        0,
+    )
+    context.paint()
+    return surface
+
+
+def rounded_rectangle(context, x, y, w, h, r):
+    context.new_sub_path()
+    context.arc(x + w - r, y + r, r, -math.pi / 2, 0)
+    context.arc(x + w - r, y + h - r, r, 0, math.pi / 2)
+    context.arc(x + r, y + h - r, r, math.pi / 2, math.pi)
+    context.arc(x + r, y + r, r, math.pi, 3 * math.pi / 2)
+    context.close_path()
+
+
+def centered_text(context, text, cx, top, size, rgb, max_width=None):
+    import cairo
+
+    context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+    context.set_font_size(size)
+    if max_width is not None:
+        while len(text) > 1 and context.text_extents(text).width > max_width:
+            text = text[:-2] + "…"
+    te = context.text_extents(text)
+    context.set_source_rgb(*rgb)
+    context.move_to(cx - te.width / 2 - te.x_bearing, top + size * 0.8)
+    context.show_text(text)
+
+
+@lru_cache(maxsize=512)
+def kenburns_photo(key):
+    return cover_surface(key[0], width, bg_height)
+
+
+@lru_cache(maxsize=512)
+def kenburns_label(name):
+    import cairo
+
+    probe = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1))
+    probe.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+    probe.set_font_size(24)
+    label_w = int(max(200, probe.text_extents(name).x_advance + 32))
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, label_w, KENBURNS_LABEL_HEIGHT)
+    context = cairo.Context(surface)
+    rounded_rectangle(context, 0, 0, label_w, KENBURNS_LABEL_HEIGHT, 6)
+    context.set_source_rgba(0, 0, 0, 0.6)
+    context.fill()
+    centered_text(context, name, label_w / 2, 6, 24, (1, 1, 1))
+    return surface
+
+
+@lru_cache(maxsize=512)
+def polaroid_card(key, name):
+    import cairo
+
+    card_w, card_h = POLAROID_CARD
+    photo_w, photo_h = POLAROID_PHOTO
+    pad = POLAROID_SHADOW
+    surface = cairo.ImageSurface(
+        cairo.FORMAT_ARGB32, card_w + 2 * pad, card_h + 2 * pad
+    )
+    context = cairo.Context(surface)
+    # Soft drop shadow: stacked translucent rounded rectangles below the card.
+    for spread in range(pad, 0, -4):
+        rounded_rectangle(
+            context,
+            pad - spread,
+            pad - spread + 4,
+            card_w + 2 * spread,
+            card_h + 2 * spread,
+            4 + spread,
+        )
+        context.set_source_rgba(0, 0, 0, 0.08)
+        context.fill()
+    rounded_rectangle(context, pad, pad, card_w, card_h, 4)
+    context.set_source_rgb(1, 1, 1)
+    context.fill()
+    context.set_source_surface(
+        cover_surface(key[0], photo_w, photo_h), pad + 12, pad + 12
+    )
+    rounded_rectangle(context, pad + 12, pad + 12, photo_w, photo_h, 2)
+    context.fill()
+    if name:
+        centered_text(
+            context,
+            name,
+            pad + card_w / 2,
+            pad + 12 + photo_h + 8,
+            18,
+            (0x22 / 255, 0x22 / 255, 0x22 / 255),
+            max_width=photo_w,
+        )
+    return surface
+
+
+@lru_cache(maxsize=512)
+def grid_cell(key, name):
+    import cairo
+
+    cell_w, cell_h = int(width / GRID_COLS), int(bg_height / GRID_ROWS)
+    img_size = int(min(width / GRID_COLS - 16, bg_height / GRID_ROWS - 40))
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, cell_w, cell_h)
+    context = cairo.Context(surface)
+    top = (cell_h - (img_size + 4 + 16)) / 2
+    left = (cell_w - img_size) / 2
+    context.set_source_surface(cover_surface(key[0], img_size, img_size), left, top)
+    rounded_rectangle(context, left, top, img_size, img_size, 6)
+    context.fill()
+    if name:
+        centered_text(
+            context,
+            name,
+            cell_w / 2,
+            top + img_size + 4,
+            14,
+            (1, 1, 1),
+            max_width=cell_w - 8,
+        )
+    return surface
+
+
+def build_sprites(style, staff_paths, staff_names=None):
+    """(sprites, number of staff members) for a style; unreadable images are skipped.
+
+    staff_names maps image file names to names, see load_staff_names.
+    """
+    from karaoke.assets import file_key
+
+    builder = {
+        # The kenburns name is a separate label sprite, see below.
+        "kenburns": lambda key, name: kenburns_photo(key),
+        "polaroid": polaroid_card,
+        "grid": grid_cell,
+    }
+    if style not in builder:
+        return [], 0
+    sprites, names = [], []
+    for path in staff_paths:
+        name = (staff_names or {}).get(os.path.basename(path), "")
+        try:
+            sprites.append(builder[style](file_key(path), name))
+        except Exception as e:
+            print(f"Error loading image {os.path.basename(path)}: {e}")
+            continue
+        names.append(name)
+    num_members = len(sprites)
+    if not num_members:
+        raise RuntimeError("None of the staff images could be loaded.")
+    if style == "kenburns":
+        # Labels follow the photos: sprite num_members + i is the name of photo i,
+        # or None for a photo without a name.
+        sprites += [kenburns_label(name) if name else None for name in names]
+    return sprites, num_members
+
+
+def paint_layers(context, sprites, layers):
+    """Paint one frame's layers over the background area with cairo transforms."""
+    for sprite_id, cx, cy, scale, rotation, opacity in layers.tolist():
+        if sprite_id < 0 or scale <= 0 or opacity <= 0:
+            continue
+        sprite = sprites[int(sprite_id)]
+        if sprite is None:
+            continue
+        context.save()
+        context.translate(cx, cy + bar_height)
+        if rotation:
+            context.rotate(rotation)
+        context.scale(scale, scale)
+        context.set_source_surface(
+            sprite, -sprite.get_width() / 2, -sprite.get_height() / 2
+        )
+        context.paint_with_alpha(opacity)
+        context.restore()
@@ -0,0 +1,32 @@
+# ---------------------------
+# Subtitle Parsing
+# ---------------------------
+def parse_time_interval(time_string):
+    start_string, end_string = time_string.split(" --> ")
+    return tuple(
+        int(t[3:5]) * 60 + int(t[6:8]) + float(t[9:12]) / 1000
+        for t in [start_string, end_string]
+    )
+
+
+def parse_subtitles(sub_file):
+    with open(sub_file, "r") as f:
+        sub_raw = f.read().strip().split("\n")
+
+    # Each element is ((start, end), subtitle_text). Blocks are index, timing,
+    # text and a blank line; malformed blocks are reported with their line number.
+    relevant_lines = []
+    for i in range(0, len(sub_raw), 4):
+        if i + 2 >= len(sub_raw):
+            raise ValueError(f"{sub_file}:{i + 1}: incomplete subtitle block")
+        try:
+            start, end = parse_time_interval(sub_raw[i + 1])
+        except ValueError:
+            raise ValueError(f"{sub_file}:{i + 2}: bad timing line {sub_raw[i + 1]!r}")
+        if end <= start:
+            raise ValueError(f"{sub_file}:{i + 2}: subtitle ends before it starts")
+        if len(sub_raw[i + 2].strip()) > 0:
+            relevant_lines.append(((start, end), sub_raw[i + 2]))
+    if not relevant_lines:
+        raise ValueError(f"{sub_file}: no subtitles found")
+    return relevant_lines
@@ -0,0 +1,149 @@
+import numpy as np
+
+from karaoke.config import (
+    credits_start_time,
+    dynamic_start,
+    static_duration,
+    static_fade_duration,
+    transition_duration,
+    width,
+)
+from karaoke.plan import scroll_params
+from karaoke.spectrum import job_spectrum
+from karaoke.styles import compile_layers, load_beats
+from karaoke.subtitles import parse_subtitles
+
+# Phase ids stored per frame.
+STATIC, TRANSITION, SCROLL, CREDITS = range(4)
+PHASE_NAMES = ("static", "transition", "scroll", "credits")
+
+
+# ---------------------------
+# Timeline Compiler
+# ---------------------------
+class Timeline:
+    """Per-frame render state for a whole video, indexed by frame number.
+
+    phase    uint8    phase id (STATIC, TRANSITION, SCROLL, CREDITS)
+    alpha    float32  logo fade-in in the static phase, blend factor in the transition
+    index    int16    composite canvas at the left edge during the scroll phase
+    offset   float32  pixels that composite is scrolled out to the left
+    subtitle int16    index into ``texts`` of the subtitle shown, or -1 for none
+    layers   float32  (frames, slots, 6) staff sprites of an animation style other
+                      than "scroll" (see karaoke.styles), or None
+    spectrum float16  (frames, bands) audio band levels in [0, 1] (see
+                      karaoke.spectrum), or None
+    """
+
+    def __init__(
+        self,
+        fps,
+        phase,
+        alpha,
+        index,
+        offset,
+        subtitle,
+        texts,
+        layers=None,
+        spectrum=None,
+    ):
+        self.fps = fps
+        self.phase = phase
+        self.alpha = alpha
+        self.index = index
+        self.offset = offset
+        self.subtitle = subtitle
+        self.texts = texts
+        self.layers = layers
+        self.spectrum = spectrum
+
+    def __len__(self):
+        return len(self.phase)
+
+    def text(self, n):
+        i = self.subtitle[n]
+        return self.texts[i] if i >= 0 else ""
+
+    def save(self, path):
+        extra = {
+            name: array
+            for name, array in (("layers", self.layers), ("spectrum", self.spectrum))
+            if array is not None
+        }
+        np.savez_compressed(
+            path,
+            fps=self.fps,
+            phase=self.phase,
+            alpha=self.alpha,
+            index=self.index,
+            offset=self.offset,
+            subtitle=self.subtitle,
+            texts=np.array(self.texts, dtype=str),
+            **extra,
+        )
+
+
+def compile_timeline(
+    nframes,
+    fps,
+    T_total,
+    num_composites,
+    relevant_lines,
+    style="scroll",
+    num_members=0,
+    beats=(),
+    spectrum=None,
+):
+    """Compute the state of every frame n (at time n / fps) in one vectorized pass.
+
+    Mirrors the branches of Renderer.draw_frame, so rendering frame n from the
+    timeline matches draw_frame(n / fps).
+    """
+    t = np.arange(nframes) / fps
+    phase = np.searchsorted(
+        [static_duration, dynamic_start, credits_start_time], t, side="right"
+    ).astype(np.uint8)
+
+    alpha = np.ones(nframes, dtype=np.float32)
+    static = phase == STATIC
+    alpha[static] = np.minimum(t[static] / static_fade_duration, 1.0)
+    transition = phase == TRANSITION
+    alpha[transition] = (t[transition] - static_duration) / transition_duration
+
+    cycle_length, scroll_speed = scroll_params(num_composites, T_total)
+    scroll = phase == SCROLL
+    pos = np.mod(scroll_speed * (t - dynamic_start), cycle_length)
+    index = np.where(scroll, pos // width, 0).astype(np.int16)
+    offset = np.where(scroll, np.mod(pos, width), 0).astype(np.float32)
+
+    # Earlier subtitles win where intervals overlap, as in Renderer.subtitle_at.
+    subtitle = np.full(nframes, -1, dtype=np.int16)
+    for i in reversed(range(len(relevant_lines))):
+        (start, end), _ = relevant_lines[i]
+        subtitle[(t >= start) & (t < end)] = i
+    subtitle[(phase == STATIC) | (phase == CREDITS)] = -1
+
+    layers = None
+    if style != "scroll":
+        # The transition blends towards the first frame of the animation.
+        t_dynamic = np.maximum(t - dynamic_start, 0)
+        duration = min(credits_start_time, T_total) - dynamic_start
+        layers = compile_layers(style, t_dynamic, num_members, duration, beats, fps)
+
+    texts = [text for _, text in relevant_lines]
+    return Timeline(fps, phase, alpha, index, offset, subtitle, texts, layers, spectrum)
+
+
+def compile_job_timeline(job, plan):
+    """Timeline of a validated job; needs no decoded assets."""
+    return compile_timeline(
+        plan["nframes"],
+        plan["fps"],
+        plan["T_total"],
+        plan["num_composites"],
+        parse_subtitles(job["subtitle_file"]),
+        style=job["style"],
+        num_members=plan["staff_images"],
+        beats=load_beats(job["beats"]),
+        spectrum=job_spectrum(job, plan),
+    )
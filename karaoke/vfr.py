@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from fractions import Fraction
+
+import numpy as np
+
+from karaoke.config import height, width
+from karaoke.encode import FFmpegWriter, concat_segments
+from karaoke.timeline import CREDITS, STATIC
+
+HOLD_FPS = 4  # frame rate of spans where nothing moves
+MIN_HOLD_SECONDS = 1.0  # shorter still spans keep the full frame rate
+TIMESCALE = 90000  # shared mp4 timescale, so that concatenated spans line up
+
+
+# ---------------------------
+# Variable Frame Rate
+# ---------------------------
+# The logo after its fade-in and the credits do not change from one frame to
+# the next, yet at --fps 120 they cost as many rendered and encoded frames as
+# the scroll. With vfr, the timeline is cut into spans: still spans are drawn
+# once and encoded at HOLD_FPS, everything else at the full rate. Each span is
+# a CFR segment, and the concat demuxer joins them with their exact durations,
+# so the output timestamps follow the timeline.
+def hold_spans(timeline, min_seconds=MIN_HOLD_SECONDS):
+    """(first, last, held) spans covering every frame of a timeline.
+
+    Frames of a held span are all identical to its first frame. A spectrum
+    changes every frame, so a timeline with one has no held spans.
+    """
+    n = len(timeline)
+    if timeline.spectrum is not None:
+        return [(0, n, False)]
+    phase = timeline.phase
+    still = ((phase == STATIC) & (timeline.alpha >= 1.0)) | (phase == CREDITS)
+    same = np.zeros(n, dtype=bool)
+    same[1:] = (
+        still[1:]
+        & still[:-1]
+        & (phase[1:] == phase[:-1])
+        & (timeline.subtitle[1:] == timeline.subtitle[:-1])
+    )
+    starts = np.flatnonzero(~same).tolist() + [n]
+
+    spans = []
+    for first, last in zip(starts, starts[1:]):
+        held = bool(still[first]) and last - first >= min_seconds * timeline.fps
+        if spans and not held and not spans[-1][2]:
+            spans[-1] = (spans[-1][0], last, False)
+        else:
+            spans.append((first, last, held))
+    return spans
+
+
+class SpanWriter(FFmpegWriter):
+    def _container_args(self, path):
+        return super()._container_args(path) + [
+            "-video_track_timescale",
+            str(TIMESCALE),
+        ]
+
+
+def render_vfr(job, plan, renderer, bar, phase_time, hold_fps=HOLD_FPS):
+    from karaoke.render import FRAME_PIX_FMT, write_frames
+
+    if job["renditions"] or job["segment_seconds"] or job["spool"]:
+        raise RuntimeError(
+            "VFR renders do not support renditions, segments or a spool."
+        )
+    if job["backend"] != "cairo":
+        raise RuntimeError("VFR renders need the cairo backend.")
+    fps = plan["fps"]
+
+    work_dir = tempfile.mkdtemp(
+        prefix=".karaoke-", dir=os.path.dirname(os.path.abspath(job["output"]))
+    )
+    try:
+        parts = []
+        for i, (first, last, held) in enumerate(hold_spans(renderer.timeline)):
+            path = os.path.join(work_dir, f"span_{i:03d}.mp4")
+            count = max(1, round((last - first) * hold_fps / fps)) if held else 0
+            # A held span's rate is chosen so its frames last exactly the span.
+            rate = Fraction(fps) * count / (last - first) if held else fps
+            with SpanWriter(
+                path,
+                (width, height),
+                rate,
+                profile=job["profile"],
+                pix_fmt=FRAME_PIX_FMT,
+            ) as writer:
+                if held:
+                    frame = renderer.render_frame(first)
+                    for _ in range(count):
+                        writer.write_frame(frame)
+                    bar.update(last - first)
+                else:
+                    write_frames(renderer, writer, plan, first, last, bar, phase_time)
+            parts.append((path, (last - first) / fps))
+
+        list_file = os.path.join(work_dir, "parts.txt")
+        with open(list_file, "w") as f:
+            for path, duration in parts:
+                f.write(f"file '{os.path.basename(path)}'\nduration {duration:.6f}\n")
+        concat_segments(list_file, job["output"], audio=job["audio"])
+    finally:
+        shutil.rmtree(work_dir)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from karaoke.config import DEFAULT_JOB, height, width
+
+# ---------------------------
+# Synthetic Fixtures
+# ---------------------------
+# Small generated inputs covering every phase: a subtitle file running past the
+# credits start, a logo, credits and a few staff images in both folders. The
+# images are gradients with a marker so that misplaced pixels show up in diffs.
+FIXTURE_SUBTITLES = [
+    ("00:00:07,000", "00:00:09,500", "Fading in"),
+    ("00:00:11,000", "00:00:20,000", "First line"),
+    ("00:00:20,000", "00:00:45,500", "Second line"),
+    ("00:01:00,000", "00:01:25,000", "Third line"),
+    ("00:01:26,000", "00:01:30,000", "After the credits start"),
+]
+
+
+def fixture_image(path, size, seed):
+    from PIL import Image
+
+    w, h = size
+    y, x = np.mgrid[0:h, 0:w]
+    pixels = np.stack(
+        [
+            (x * 255 // max(w - 1, 1) + seed * 40) % 256,
+            (y * 255 // max(h - 1, 1) + seed * 90) % 256,
+            ((x + y) // 4 + seed * 20) % 256,
+        ],
+        axis=-1,
+    ).astype(np.uint8)
+    # A white square off-center, so shifts and flips change the frame.
+    pixels[h // 5 : h // 5 + h // 8, w // 7 : w // 7 + h // 8] = 255
+    Image.fromarray(pixels).save(path)
+
+
+def make_fixtures(directory):
+    """Write the fixture files into directory and return a job rendering them."""
+    with open(os.path.join(directory, "lyrics.srt"), "w") as f:
+        for i, (start, end, text) in enumerate(FIXTURE_SUBTITLES, 1):
+            f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
+    fixture_image(os.path.join(directory, "logo.png"), (width, height), 0)
+    fixture_image(os.path.join(directory, "credits.png"), (width // 2, height), 1)
+    seed = 2
+    names = []
+    for folder, count in (("instrcutros", 2), ("tas", 3)):
+        os.makedirs(os.path.join(directory, "staff", folder))
+        for i in range(count):
+            path = os.path.join(directory, "staff", folder, f"{folder}_{i}.png")
+            fixture_image(path, (300 + 40 * i, 400), seed)
+            seed += 1
+            # The last image has no name, like a member missing from the list.
+            if (folder, i) != ("tas", count - 1):
+                names.append(
+                    {
+                        "image": f"{folder}/{folder}_{i}.png",
+                        "name": f"Member {len(names) + 1}",
+                    }
+                )
+    with open(os.path.join(directory, "staff.json"), "w") as f:
+        json.dump(names, f)
+    return {
+        **DEFAULT_JOB,
+        "subtitle_file": os.path.join(directory, "lyrics.srt"),
+        "staff_dir": os.path.join(directory, "staff"),
+        "logo": os.path.join(directory, "logo.png"),
+        "credits": os.path.join(directory, "credits.png"),
+        "staff_names": os.path.join(directory, "staff.json"),
+        "output": os.path.join(directory, "output.mp4"),
+        "fps": 24,
+    }
+
+
+# ---------------------------
+# Frame Comparison
+# ---------------------------
+def sample_frames(plan):
+    """First, middle and last frame of every phase."""
+    frames = []
+    for phase in plan["phases"]:
+        first, count = phase["first_frame"], phase["frames"]
+        for n in (first, first + count // 2, first + count - 1):
+            if n not in frames:
+                frames.append(n)
+    return frames
+
+
+def plan_phase(plan, n):
+    for phase in plan["phases"]:
+        if phase["first_frame"] <= n < phase["first_frame"] + phase["frames"]:
+            return phase["name"]
+    return "?"
+
+
+def compare(reference, frame):
+    diff = reference.astype("int16") - frame.astype("int16")
+    mse = float((diff.astype("float64") ** 2).mean())
+    return {
+        "exact": hashlib.sha256(reference.tobytes()).digest()
+        == hashlib.sha256(frame.tobytes()).digest(),
+        "max_abs": int(abs(diff).max()),
+        "psnr": math.inf if mse == 0 else 10 * math.log10(255**2 / mse),
+    }
+
+
+def save_diff(name, reference, frame):
+    """With KARAOKE_DIFF_DIR set, save reference, candidate and amplified difference."""
+    from PIL import Image
+
+    directory = os.environ.get("KARAOKE_DIFF_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    diff = np.abs(reference.astype("int16") - frame.astype("int16")).astype(np.uint8)
+    strip = np.concatenate([reference, frame, np.minimum(diff * 8, 255)], axis=1)
+    Image.fromarray(strip.astype(np.uint8)).save(os.path.join(directory, f"{name}.png"))
@@ -0,0 +1,257 @@
+import os
+
+import cairo
+import numpy as np
+from PIL import Image
+
+# ---------------------------
+# Frozen Reference Renderer
+# ---------------------------
+# The draw_frame of the original main.py script, before the karaoke package
+# existed, with only the input paths and the duration turned into parameters.
+# It deliberately imports nothing from karaoke: every render path is compared
+# against this copy, so it must never be refactored along with the package.
+width, height = 1280, 720
+bar_height = 80  # Gradient bar at the top
+bg_height = height - bar_height  # Background area for images
+
+# Durations (in seconds)
+static_duration = 6.5  # Static phase (logo shown)
+transition_duration = 3.5  # Transition phase (fade from static to dynamic)
+dynamic_start = static_duration + transition_duration
+credits_start_time = 86.00  # At this time, stop scrolling and show credits
+
+
+def load_cover(path):
+    img = Image.open(path).convert("RGB")
+    img_width, img_height = img.size
+    # Use "cover" scaling so that the image fills the entire frame.
+    scale = min(width / img_width, height / img_height)
+    new_width = int(img_width * scale)
+    new_height = int(img_height * scale)
+    img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+    # Center-crop to exactly (width, height)
+    left = (new_width - width) // 2
+    top = (new_height - height) // 2
+    img_cropped = img_resized.crop((left, top, left + width, top + height))
+    img_array = np.array(img_cropped, dtype=np.uint8)
+    img_array = img_array[:, :, ::-1]  # Convert RGB to BGRA order for cairo
+    canvas = np.empty((height, width, 4), dtype=np.uint8)
+    canvas[:, :, :3] = img_array
+    canvas[:, :, 3] = 255
+    return canvas
+
+
+def parse_time_interval(time_string):
+    start_string, end_string = time_string.split(" --> ")
+    return tuple(
+        int(t[3:5]) * 60 + int(t[6:8]) + float(t[9:12]) / 1000
+        for t in [start_string, end_string]
+    )
+
+
+def parse_subtitles(sub_file):
+    with open(sub_file, "r") as f:
+        sub_raw = f.read().strip().split("\n")
+    # Each element is ((start, end), subtitle_text)
+    return [
+        (parse_time_interval(sub_raw[i + 1]), sub_raw[i + 2])
+        for i in range(0, len(sub_raw), 4)
+        if len(sub_raw[i + 2].strip()) > 0
+    ]
+
+
+def load_backgrounds(staff_dir):
+    # Collect all PNG file paths (with their root) from the "staff" folder.
+    image_list = []
+    for root, _, files in os.walk(staff_dir):
+        for file in files:
+            if file.lower().endswith(".png"):
+                image_list.append((root, file))
+
+    # Sort the list so that images whose root contains "instrcutros" come first.
+    image_list.sort(
+        key=lambda tup: (0 if "instrcutros" in tup[0].lower() else 1, tup[0], tup[1])
+    )
+
+    half_width = width // 2
+    half_canvases = []
+    for root, file in image_list:
+        img = Image.open(os.path.join(root, file)).convert("RGB")
+        img_width, img_height = img.size
+
+        # Fit scaling: scale so the image's height equals bg_height.
+        scale = bg_height / img_height
+        new_width = int(img_width * scale)
+        new_height = bg_height  # by design
+        img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+
+        # Create a half-canvas with a black background.
+        half_canvas = np.zeros((bg_height, half_width, 4), dtype=np.uint8)
+        half_canvas[..., 3] = 255
+
+        # Center the resized image horizontally within the half-canvas.
+        left_margin = (half_width - new_width) // 2
+        if new_width > half_width:
+            img_array = np.array(img_resized)[:, :half_width, :]
+        else:
+            img_array = np.array(img_resized)
+        # Swap channels for cairo (BGRA)
+        img_array = img_array[:, :, ::-1]
+        paste_start = max(0, left_margin)
+        paste_end = paste_start + min(new_width, half_width)
+        half_canvas[:, paste_start:paste_end, :3] = img_array[
+            :, : (paste_end - paste_start), :
+        ]
+        half_canvases.append(half_canvas)
+
+    # Each composite canvas holds two half-canvases side by side.
+    composite_canvases = []
+    num_half = len(half_canvases)
+    i = 0
+    while i < num_half:
+        composite = np.zeros((bg_height, width, 4), dtype=np.uint8)
+        composite[..., 3] = 255
+        composite[:, 0:half_width, :] = half_canvases[i]
+        if i + 1 < num_half:
+            composite[:, half_width:width, :] = half_canvases[i + 1]
+        else:
+            composite[:, half_width:width, :] = half_canvases[i]
+        composite_canvases.append(composite)
+        i += 2
+    return composite_canvases
+
+
+def get_npimage(surface, width, height):
+    im = np.frombuffer(surface.get_data(), np.uint8).reshape((height, width, 4))
+    # Cairo stores pixels as BGRA; reorder to RGB.
+    return im[:, :, [2, 1, 0]]
+
+
+def image_surface(canvas, h):
+    return cairo.ImageSurface.create_for_data(
+        memoryview(canvas).cast("B"), cairo.FORMAT_ARGB32, width, h, width * 4
+    )
+
+
+def paint_bar(context, text):
+    gradient = cairo.LinearGradient(0, 0, width, 0)
+    gradient.add_color_stop_rgb(0, 198 / 255, 22 / 255, 141 / 255)
+    gradient.add_color_stop_rgb(0.5, 102 / 255, 45 / 255, 145 / 255)
+    gradient.add_color_stop_rgb(1, 0, 161 / 255, 199 / 255)
+    context.rectangle(0, 0, width, bar_height)
+    context.set_source(gradient)
+    context.fill()
+    if text:
+        context.select_font_face(
+            "Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL
+        )
+        context.set_font_size(40)
+        context.set_source_rgb(1, 1, 1)
+        te = context.text_extents(text)
+        x_text = (width - te.width) / 2 - te.x_bearing
+        y_text = (bar_height - te.height) / 2 - te.y_bearing
+        context.move_to(x_text, y_text)
+        context.show_text(text)
+
+
+class BaselineRenderer:
+    def __init__(self, subtitle_file, staff_dir, logo, credits, T_total=None):
+        self.logo_canvas = load_cover(logo)
+        self.credts_canvas = load_cover(credits)
+        self.relevant_lines = parse_subtitles(subtitle_file)
+        self.background_images = load_backgrounds(staff_dir)
+        self.num_composites = len(self.background_images)
+        self.cycle_length = self.num_composites * width
+        if T_total is None:
+            T_total = max(time_tuple[1] for (time_tuple, _) in self.relevant_lines)
+        self.scroll_speed = self.cycle_length / (T_total - dynamic_start)
+
+    def subtitle_at(self, time):
+        for (start, end), text in self.relevant_lines:
+            if start <= time < end:
+                return text
+        return ""
+
+    def draw_frame(self, time):
+        if time < static_duration:
+            # Static phase: display the static logo with fade-in.
+            static_fade_duration = 2.0  # seconds for fade-in
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            context = cairo.Context(surface)
+            context.set_source_rgb(0, 0, 0)
+            context.rectangle(0, 0, width, height)
+            context.fill()
+            if time < static_fade_duration:
+                alpha = time / static_fade_duration
+            else:
+                alpha = 1.0
+            context.set_source_surface(image_surface(self.logo_canvas, height), 0, 0)
+            context.paint_with_alpha(alpha)
+            paint_bar(context, "Welcome to 6.390!")
+            return get_npimage(surface, width, height)
+
+        elif time < dynamic_start:
+            # Transition phase: blend static logo and dynamic scrolling frame.
+            t_norm = (time - static_duration) / transition_duration  # 0 to 1
+            static_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            static_ctx = cairo.Context(static_surface)
+            static_ctx.set_source_surface(image_surface(self.logo_canvas, height), 0, 0)
+            static_ctx.paint()
+            paint_bar(static_ctx, "Welcome to 6.390!")
+            static_frame = get_npimage(static_surface, width, height)
+
+            # Generate dynamic frame at initial dynamic state (t_dynamic = 0).
+            dynamic_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            dynamic_ctx = cairo.Context(dynamic_surface)
+            current_canvas = self.background_images[0]
+            next_canvas = self.background_images[1 % self.num_composites]
+            dynamic_ctx.set_source_surface(
+                image_surface(current_canvas, bg_height), 0, bar_height
+            )
+            dynamic_ctx.paint()
+            dynamic_ctx.set_source_surface(
+                image_surface(next_canvas, bg_height), width, bar_height
+            )
+            dynamic_ctx.paint()
+            paint_bar(dynamic_ctx, self.subtitle_at(time))
+            dynamic_frame = get_npimage(dynamic_surface, width, height)
+
+            # Blend the static and dynamic frames.
+            blended = (1 - t_norm) * static_frame.astype(
+                np.float32
+            ) + t_norm * dynamic_frame.astype(np.float32)
+            return np.clip(blended, 0, 255).astype(np.uint8)
+
+        elif time < credits_start_time:
+            # Dynamic scrolling phase.
+            t_dynamic = time - dynamic_start
+            pos = (self.scroll_speed * t_dynamic) % self.cycle_length
+            current_index = int(pos // width)
+            offset = pos % width
+            x_offset = -offset
+            current_canvas = self.background_images[current_index]
+            next_index = (current_index + 1) % self.num_composites
+            next_canvas = self.background_images[next_index]
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            context = cairo.Context(surface)
+            context.set_source_surface(
+                image_surface(current_canvas, bg_height), x_offset, bar_height
+            )
+            context.paint()
+            context.set_source_surface(
+                image_surface(next_canvas, bg_height), x_offset + width, bar_height
+            )
+            context.paint()
+            paint_bar(context, self.subtitle_at(time))
+            return get_npimage(surface, width, height)
+
+        else:
+            # Credits phase: display the static credits image.
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            context = cairo.Context(surface)
+            context.set_source_surface(image_surface(self.credts_canvas, height), 0, 0)
+            context.paint()
+            # Optionally, draw the gradient bar at the top.
+            paint_bar(context, "")
+            return get_npimage(surface, width, height)
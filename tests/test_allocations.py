@@ -0,0 +1,112 @@
+import sys
+import tracemalloc
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+cairo = pytest.importorskip("cairo")
+
+import karaoke.render  # noqa: E402
+from karaoke.config import STYLES, height, width  # noqa: E402
+from karaoke.plan import make_plan  # noqa: E402
+from karaoke.render import build_renderer  # noqa: E402
+
+from tests.fixtures import make_fixtures  # noqa: E402
+
+# ---------------------------
+# Steady-State Allocations
+# ---------------------------
+# render_frame draws into a small ring of preallocated surfaces. Each style
+# renders every frame of the fixtures (2160 at 24 fps) once to fill the sprite
+# caches; every test then renders them all again and must not allocate anything
+# frame-sized. tracemalloc only sees Python allocations, while cairo and pixman
+# allocate in C, so the frame buffers and surface creations are checked
+# directly as well.
+GROWTH_BUDGET = 64 * 1024  # bytes the traced pass may keep
+
+
+@pytest.fixture(scope="module")
+def job(tmp_path_factory):
+    return make_fixtures(str(tmp_path_factory.mktemp("allocations")))
+
+
+@pytest.fixture(scope="module", params=STYLES)
+def warm_renderer(request, job):
+    """Renderer of one style, with every frame already rendered once."""
+    job = {**job, "style": request.param}
+    plan = make_plan(job)
+    renderer = build_renderer(job, plan)
+    frames = range(plan["nframes"])
+    for n in frames:
+        renderer.render_frame(n)
+    return renderer, frames
+
+
+class CountingCairo:
+    """Stand-in for the cairo module that counts created surfaces and contexts."""
+
+    def __init__(self, cairo):
+        self.cairo = cairo
+        self.created = []
+        counter = self
+
+        class ImageSurface:
+            def __new__(cls, *args):
+                counter.created.append("ImageSurface")
+                return cairo.ImageSurface(*args)
+
+            @staticmethod
+            def create_for_data(*args):
+                counter.created.append("ImageSurface.create_for_data")
+                return cairo.ImageSurface.create_for_data(*args)
+
+        self.ImageSurface = ImageSurface
+
+    def Context(self, surface):
+        self.created.append("Context")
+        return self.cairo.Context(surface)
+
+    def __getattr__(self, name):
+        return getattr(self.cairo, name)
+
+
+def test_frames_are_pool_buffers(warm_renderer):
+    renderer, frames = warm_renderer
+    slots = list(renderer.pool.slots)
+    buffers = {pixels.ctypes.data for _, _, pixels in slots}
+    for n in frames:
+        frame = renderer.render_frame(n)
+        assert frame.shape == (height, width, 4)
+        assert frame.ctypes.data in buffers, f"frame {n} is not a pooled buffer"
+    assert renderer.pool.slots == slots, "the pool replaced its surfaces"
+
+
+def test_no_surfaces_created(warm_renderer, monkeypatch):
+    renderer, frames = warm_renderer
+    counting = CountingCairo(cairo)
+    # karaoke.render imports cairo at the top, karaoke.styles inside functions.
+    monkeypatch.setattr(karaoke.render, "cairo", counting)
+    monkeypatch.setitem(sys.modules, "cairo", counting)
+    for n in frames:
+        renderer.render_frame(n)
+    assert counting.created == []
+
+
+def test_memory_stays_flat(warm_renderer):
+    renderer, frames = warm_renderer
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for n in frames:
+            renderer.render_frame(n)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert (
+        current - baseline <= GROWTH_BUDGET
+    ), f"memory grew by {current - baseline} bytes over {len(frames)} frames"
+    assert (
+        peak - baseline < width * height * 3
+    ), f"a frame allocated up to {peak - baseline} bytes"
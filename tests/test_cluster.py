@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import subprocess
+import time as timer
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+pytest.importorskip("cairo")
+
+import karaoke.render  # noqa: E402
+from karaoke.cluster import Queue, coordinate  # noqa: E402
+from karaoke.config import height, width  # noqa: E402
+from karaoke.encode import ffmpeg_exe  # noqa: E402
+from karaoke.plan import make_plan  # noqa: E402
+
+from tests.fixtures import make_fixtures  # noqa: E402
+
+# ---------------------------
+# Queued Renders
+# ---------------------------
+# The queue logic is exercised with a stub renderer that fills frame n with one
+# gray level, so that the stitched video shows whether every frame arrived once
+# and in order. The local workers are forked and inherit the stub.
+FPS = 2  # the fixtures' 90 seconds in 180 frames
+SEGMENT_SECONDS = 10
+LEVEL_TOLERANCE = 6  # uniform gray through the preview profile
+
+
+def level(n):
+    return 20 + (n * 37) % 200
+
+
+class StubRenderer:
+    def __init__(self):
+        self.frame = np.empty((height, width, 4), dtype=np.uint8)
+
+    def render_frame(self, n):
+        self.frame[...] = level(n)
+        return self.frame
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("local workers only inherit the stub renderer when forked")
+    monkeypatch.setattr(
+        karaoke.render, "build_renderer", lambda job, plan: StubRenderer()
+    )
+    return {
+        **make_fixtures(str(tmp_path)),
+        "fps": FPS,
+        "segment_seconds": SEGMENT_SECONDS,
+        "profile": "preview",
+    }
+
+
+def decoded_levels(path):
+    raw = subprocess.run(
+        [ffmpeg_exe(), "-v", "error", "-i", path]
+        + ["-f", "rawvideo", "-pix_fmt", "gray", "-"],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    return np.frombuffer(raw, np.uint8).reshape((-1, height, width)).mean(axis=(1, 2))
+
+
+def check_output(job):
+    nframes = make_plan(job)["nframes"]
+    levels = decoded_levels(job["output"])
+    assert len(levels) == nframes
+    expected = np.array([level(n) for n in range(nframes)])
+    wrong = np.flatnonzero(np.abs(levels - expected) > LEVEL_TOLERANCE)
+    assert not len(wrong), f"frames {wrong.tolist()} are not where they belong"
+
+
+def test_local_workers_render_every_segment_once(job, tmp_path):
+    queue_dir = tmp_path / "queue"
+    coordinate(job, str(queue_dir), local_workers=3, progress=False)
+    check_output(job)
+    assert not queue_dir.exists()
+
+
+def test_resume_requeues_stale_claims_and_lost_segments(job, tmp_path):
+    queue = Queue(str(tmp_path / "queue"))
+    segments = queue.publish(job, make_plan(job)["nframes"])["segments"]
+    assert len(segments) > 3
+    # A worker that died holding segment 0, an hour ago.
+    assert queue.claim() == 0
+    stale = timer.time() - 3600
+    os.utime(queue.entry("claimed", 0), (stale, stale))
+    # Segment 1 was marked done, but its video is gone.
+    assert queue.claim() == 1
+    os.rename(queue.entry("claimed", 1), queue.entry("done", 1))
+
+    coordinate(job, queue.dir, local_workers=2, progress=False)
+    check_output(job)
+
+
+def test_claim_complete_and_requeue_race(job, tmp_path):
+    queue = Queue(str(tmp_path / "queue"))
+    queue.publish(job, make_plan(job)["nframes"])
+    first = queue.claim()
+    # The coordinator gives up on the first worker and another claims the segment.
+    stale = timer.time() - 3600
+    os.utime(queue.entry("claimed", first), (stale, stale))
+    queue.requeue_stale()
+    assert first in queue.entries("pending")
+    assert queue.claim() == first
+
+    # Both finish; whichever completes first records the segment, the other
+    # only replaces the video with an identical one.
+    for worker in ("slow", "fast"):
+        partial = os.path.join(queue.folder("segments"), f"{worker}.partial.mp4")
+        with open(partial, "w") as f:
+            f.write(worker)
+        queue.complete(first, partial)
+        assert queue.entries("done") == [first]
+        assert first not in queue.entries("claimed") + queue.entries("pending")
+    assert os.path.isfile(queue.segment_path(first))
+
+    # A heartbeat or release for a finished segment changes nothing.
+    queue.heartbeat(first)
+    queue.release(first)
+    assert queue.entries("done") == [first]
+
+
+def test_queued_render_rejects_ffmpeg_backend(job, tmp_path):
+    with pytest.raises(RuntimeError, match="cairo backend"):
+        coordinate({**job, "backend": "ffmpeg"}, str(tmp_path / "queue"))